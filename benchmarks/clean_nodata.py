@@ -0,0 +1,82 @@
+"""Times `cog._clean` against the previous masked array implementation.
+
+Usage:
+
+    python benchmarks/clean_nodata.py [<grid size>]
+
+Every subdataset in `constants.MULTIPLE_NODATA` is cleaned using random data of
+the COG data type, with a tenth of the pixels set to each nodata value. The
+outputs of both implementations are checked to be identical.
+"""
+
+import sys
+import timeit
+from typing import Any, List, Tuple, cast
+
+import numpy as np
+
+from stactools.viirs import cog
+from stactools.viirs.constants import MULTIPLE_NODATA
+from stactools.viirs.fragment import STACFragments
+
+
+def clean_masked_arrays(
+    data: Any, nodatas: List[int], nodata_new: int
+) -> Tuple[Any, Any]:
+    for nodata in nodatas:
+        data = np.ma.masked_equal(data, nodata)
+    clean_data = np.ma.filled(data, nodata_new)
+    mask = np.ma.getmaskarray(data)
+    clean_nodata = np.ma.getdata(data).copy()
+    clean_nodata[~mask] = nodata_new
+    return (clean_data, clean_nodata)
+
+
+def synthetic_data(dtype: str, nodatas: List[int], size: int) -> Any:
+    rng = np.random.default_rng(0)
+    info = np.iinfo(dtype)
+    data = rng.integers(info.min, info.max, (size, size), dtype=dtype, endpoint=True)
+    step = 10 * len(nodatas)
+    for i, nodata in enumerate(nodatas):
+        data.flat[i::step] = nodata
+    return data
+
+
+def main(size: int) -> None:
+    print(
+        f"{'product':<9} {'subdataset':<32} {'dtype':<6} {'n':>2} {'old ms':>8} {'new ms':>8}"
+    )
+    for product, subdatasets in MULTIPLE_NODATA.items():
+        fragments = STACFragments(product)
+        for name, multiple in subdatasets.items():
+            dtype = fragments.subdataset_dict(name)["raster:bands"][0]["data_type"]
+            nodatas = cast(List[int], multiple["multiple"])
+            nodata_new = cast(int, multiple["new"])
+            data = synthetic_data(dtype, nodatas, size)
+
+            old = clean_masked_arrays(data.copy(), nodatas, nodata_new)
+            new = cog._clean(data.copy(), nodatas, nodata_new)
+            assert all(np.array_equal(o, n) for o, n in zip(old, new))
+
+            old_ms = min(
+                timeit.repeat(
+                    lambda: clean_masked_arrays(data.copy(), nodatas, nodata_new),
+                    number=1,
+                    repeat=5,
+                )
+            )
+            new_ms = min(
+                timeit.repeat(
+                    lambda: cog._clean(data.copy(), nodatas, nodata_new),
+                    number=1,
+                    repeat=5,
+                )
+            )
+            print(
+                f"{product:<9} {name:<32} {dtype:<6} {len(nodatas):>2} "
+                f"{old_ms * 1000:>8.1f} {new_ms * 1000:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2400)
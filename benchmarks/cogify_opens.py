@@ -0,0 +1,57 @@
+"""Counts file opens and wall time per granule for `cog.cogify`.
+
+Usage:
+
+    python benchmarks/cogify_opens.py <H5 file> [<H5 file> ...]
+
+Every `h5py.File` and `rasterio.open` call made while converting a granule is
+counted, including those made while extracting metadata.
+"""
+
+import sys
+import time
+from collections import Counter
+from tempfile import TemporaryDirectory
+from typing import Any, List
+
+import h5py
+import rasterio
+
+from stactools.viirs import cog
+
+OPENS: "Counter[str]" = Counter()
+
+_H5File = h5py.File
+_rasterio_open = rasterio.open
+
+
+class CountingFile(_H5File):  # type: ignore
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        OPENS["h5py.File"] += 1
+        super().__init__(*args, **kwargs)
+
+
+def counting_open(*args: Any, **kwargs: Any) -> Any:
+    OPENS["rasterio.open"] += 1
+    return _rasterio_open(*args, **kwargs)
+
+
+def main(hrefs: List[str]) -> None:
+    h5py.File = CountingFile
+    rasterio.open = counting_open
+    print(f"{'granule':<50} {'cogs':>5} {'h5py':>5} {'gdal':>5} {'seconds':>8}")
+    for href in hrefs:
+        OPENS.clear()
+        with TemporaryDirectory() as tmp_dir:
+            start = time.perf_counter()
+            paths = cog.cogify(href, tmp_dir)
+            elapsed = time.perf_counter() - start
+        name = href.rsplit("/", 1)[-1]
+        print(
+            f"{name:<50} {len(paths):>5} {OPENS['h5py.File']:>5} "
+            f"{OPENS['rasterio.open']:>5} {elapsed:>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
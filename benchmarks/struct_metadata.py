@@ -0,0 +1,66 @@
+"""Times `metadata.parse_grid_structure` against the previous line split parsing.
+
+Usage:
+
+    python benchmarks/struct_metadata.py <H5 file> [<H5 file> ...]
+
+The StructMetadata.0 string of each granule is parsed with both approaches,
+e.g., for all example products in ``tests/data-files/external/*.h5``. The grid
+extent used for the Item is checked to be identical.
+"""
+
+import ast
+import sys
+import timeit
+from typing import Any, Dict, List, Tuple
+
+import h5py
+
+from stactools.viirs.metadata import Grid, parse_grid_structure
+
+
+def extent_split(metadata_str: str) -> Tuple[Any, ...]:
+    metadata_split_str = [m.strip() for m in metadata_str.strip().split("\n")]
+    metadata_keys_values = [s.split("=") for s in metadata_split_str][:-1]
+    metadata_dict: Dict[str, str] = {key: value for key, value in metadata_keys_values}
+    shape = [int(metadata_dict["YDim"]), int(metadata_dict["XDim"])]
+    left, top = ast.literal_eval(metadata_dict["UpperLeftPointMtrs"])
+    right, bottom = ast.literal_eval(metadata_dict["LowerRightMtrs"])
+    return (shape, left, right, top, bottom)
+
+
+def extent_odl(metadata_str: str) -> Tuple[Any, ...]:
+    grids = [
+        Grid.from_fields(name, fields)
+        for name, fields in parse_grid_structure(metadata_str).items()
+    ]
+    grid = grids[-1]
+    return (grid.shape, grid.left, grid.right, grid.top, grid.bottom)
+
+
+def main(hrefs: List[str]) -> None:
+    print(f"{'granule':<50} {'grids':>5} {'bytes':>6} {'old us':>8} {'new us':>8}")
+    for href in hrefs:
+        with h5py.File(href, "r") as h5:
+            metadata_str = h5["HDFEOS INFORMATION"]["StructMetadata.0"][()].decode(
+                "utf-8"
+            )
+        assert extent_split(metadata_str) == extent_odl(metadata_str)
+
+        number = 1000
+        old_us = min(
+            timeit.repeat(lambda: extent_split(metadata_str), number=number, repeat=5)
+        )
+        new_us = min(
+            timeit.repeat(lambda: extent_odl(metadata_str), number=number, repeat=5)
+        )
+        name = href.rsplit("/", 1)[-1]
+        print(
+            f"{name:<50} {len(parse_grid_structure(metadata_str)):>5} "
+            f"{len(metadata_str):>6} {old_us * 1e6 / number:>8.1f} "
+            f"{new_us * 1e6 / number:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
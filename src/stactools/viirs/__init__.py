@@ -1,14 +1,26 @@
+from typing import TYPE_CHECKING, Any
+
 import stactools.core
-from stactools.cli.registry import Registry
 
-from stactools.viirs.stac import create_collection, create_item
+if TYPE_CHECKING:
+    from stactools.cli.registry import Registry
 
 __all__ = ["create_item", "create_collection"]
 
 stactools.core.use_fsspec()
 
 
-def register_plugin(registry: Registry) -> None:
+def __getattr__(name: str) -> Any:
+    # Item and Collection creation pull in h5py, rasterio and shapely, so they
+    # are only imported when first used rather than when the plugin is loaded.
+    if name in __all__:
+        from stactools.viirs import stac
+
+        return getattr(stac, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def register_plugin(registry: "Registry") -> None:
     from stactools.viirs import commands
 
     registry.register_subcommand(commands.create_viirs_command)
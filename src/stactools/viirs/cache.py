@@ -0,0 +1,125 @@
+import json
+import logging
+import sqlite3
+from contextlib import closing
+from typing import Any, Optional
+
+import fsspec
+from stactools.core.io import ReadHrefModifier
+
+from stactools.viirs import utils
+from stactools.viirs.metadata import Metadata
+
+logger = logging.getLogger(__name__)
+
+# Increment when the serialized Metadata changes so stale records are ignored
+RECORD_VERSION = 1
+
+
+class MetadataCache:
+    """Persistent SQLite store of metadata extracted from VIIRS H5 files.
+
+    Records are keyed by the granule ID (see :func:`utils.id_from_h5`) and are
+    only returned while the H5 file fingerprint, i.e., its ETag if the storage
+    provides one or its size and modification time otherwise, is unchanged.
+    A cached record therefore avoids all reads of the H5 file.
+
+    A connection is opened for each operation, so a cache may be shared by
+    multiple processes and pickled to them.
+
+    Args:
+        path (str): Path to the SQLite database file. Created if it does not
+            exist.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata ("
+                "id TEXT PRIMARY KEY, fingerprint TEXT, version INTEGER, record TEXT)"
+            )
+
+    def get(
+        self, h5_href: str, read_href_modifier: Optional[ReadHrefModifier] = None
+    ) -> Optional[Metadata]:
+        """Returns the cached metadata for an H5 file, if current.
+
+        Args:
+            h5_href (str): HREF to the H5 file
+            read_href_modifier (ReadHrefModifier, optional): An optional
+                function to modify the href (e.g. to add a token to a url)
+
+        Returns:
+            Optional[Metadata]: The cached metadata, or None if the H5 file is
+            not cached or has changed since it was cached
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT fingerprint, version, record FROM metadata WHERE id = ?",
+                (utils.id_from_h5(h5_href),),
+            ).fetchone()
+        if row is None:
+            return None
+        fingerprint, version, record = row
+        if version != RECORD_VERSION or fingerprint != source_fingerprint(
+            h5_href, read_href_modifier
+        ):
+            return None
+
+        metadata = Metadata.from_dict(json.loads(record))
+        if metadata.xml_href:
+            # the H5 file may have moved along with its XML file
+            metadata.xml_href = f"{h5_href}.xml"
+        logger.debug(f"Using cached metadata for {h5_href}")
+        return metadata
+
+    def put(
+        self,
+        h5_href: str,
+        metadata: Metadata,
+        read_href_modifier: Optional[ReadHrefModifier] = None,
+    ) -> None:
+        """Caches the metadata for an H5 file.
+
+        Args:
+            h5_href (str): HREF to the H5 file
+            metadata (Metadata): The metadata extracted from the H5 file
+            read_href_modifier (ReadHrefModifier, optional): An optional
+                function to modify the href (e.g. to add a token to a url)
+        """
+        record = metadata.to_dict()
+        record["bytes_read"] = None
+        fingerprint = source_fingerprint(h5_href, read_href_modifier)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)",
+                (metadata.id, fingerprint, RECORD_VERSION, json.dumps(record)),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60)
+
+
+def source_fingerprint(
+    h5_href: str, read_href_modifier: Optional[ReadHrefModifier] = None
+) -> str:
+    """Identifies the content of an H5 file without reading it.
+
+    Args:
+        h5_href (str): HREF to the H5 file
+        read_href_modifier (ReadHrefModifier, optional): An optional
+            function to modify the href (e.g. to add a token to a url)
+
+    Returns:
+        str: The ETag of the file if the storage provides one, or its size and
+        modification time otherwise
+    """
+    read_h5_href = utils.modify_href(h5_href, read_href_modifier)
+    fs, path = fsspec.core.url_to_fs(read_h5_href)
+    info: Any = fs.info(path)
+    etag = info.get("ETag") or info.get("etag")
+    if etag:
+        return f"etag:{etag}"
+    mtime = info.get("mtime") or info.get("LastModified") or info.get("last_modified")
+    return f"{info['size']}:{mtime}"
@@ -1,151 +1,793 @@
+import logging
 import os
-from typing import Any, Dict, List, Optional, Tuple, cast
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from tempfile import TemporaryDirectory
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
-import h5py
 import numpy as np
 import rasterio
 import rasterio.shutil
 from rasterio.io import MemoryFile
+from rasterio.windows import Window
 
-from stactools.viirs.constants import MULTIPLE_NODATA
-from stactools.viirs.metadata import viirs_metadata
-from stactools.viirs.utils import ignore_not_georeferenced
+from stactools.viirs.constants import (
+    BAND_MODES,
+    FOOTPRINT_DATA_ASSETS,
+    MULTIPLE_NODATA,
+)
+from stactools.viirs.fragment import STACFragments
+from stactools.viirs.granule import Granule, Subdataset
+from stactools.viirs.manifest import CogManifest
+from stactools.viirs.metadata import Metadata, viirs_metadata
+from stactools.viirs.utils import (
+    UnsupportedProduct,
+    check_if_supported,
+    gdal_supports_int8,
+    ignore_not_georeferenced,
+)
+
+logger = logging.getLogger(__name__)
 
 COG_PROFILE = {"compress": "deflate", "blocksize": 512, "driver": "COG"}
 
 
+@dataclass(frozen=True)
+class EncodingProfile:
+    """COG encoding options.
+
+    Attributes:
+        compress (str): Compression method, e.g., 'deflate' or 'zstd'
+        level (int, optional): Compression level. The GDAL default for the
+            compression method is used if not given.
+        predictor (bool): Flag to apply a predictor before compression:
+            horizontal differencing for integer data and floating point
+            prediction for float data
+        float_compress (str, optional): Compression method for float data,
+            e.g., 'lerc_zstd', replacing ``compress``
+        max_z_error (float): Maximum error of LERC compression. Default is 0,
+            i.e., lossless.
+        num_threads (str, optional): Number of threads GDAL uses to compress
+            each COG, an integer or 'ALL_CPUS'. Single threaded if not given.
+        blocksize (int): Tile width and height. Default is 512.
+    """
+
+    compress: str = "deflate"
+    level: Optional[int] = None
+    predictor: bool = False
+    float_compress: Optional[str] = None
+    max_z_error: float = 0.0
+    num_threads: Optional[str] = None
+    blocksize: int = 512
+
+    def creation_options(self, dtype: Any) -> Dict[str, Any]:
+        """Returns the COG driver creation options for data of a given type.
+
+        Args:
+            dtype (Any): Numpy data type of the COG data
+
+        Returns:
+            Dict[str, Any]: Creation options for ``rasterio.shutil.copy``
+        """
+        compress = self.compress
+        if self.float_compress and np.dtype(dtype).kind == "f":
+            compress = self.float_compress
+        options: Dict[str, Any] = {
+            "compress": compress,
+            "blocksize": self.blocksize,
+            "driver": "COG",
+        }
+        if self.level is not None:
+            options["level"] = self.level
+        if self.predictor:
+            options["predictor"] = "YES"  # the COG driver picks 2 or 3 by type
+        if compress.lower().startswith("lerc"):
+            options["max_z_error"] = self.max_z_error
+        if self.num_threads:
+            options["num_threads"] = self.num_threads
+        return options
+
+
+# Named encoding profiles. 'deflate' matches ``COG_PROFILE``.
+COG_PROFILES = {
+    "deflate": EncodingProfile(),
+    "deflate-predictor": EncodingProfile(predictor=True),
+    "zstd": EncodingProfile(compress="zstd", level=9, predictor=True),
+    "lerc": EncodingProfile(
+        compress="zstd", level=9, predictor=True, float_compress="lerc_zstd"
+    ),
+}
+DEFAULT_COG_PROFILE = "deflate"
+
+ProfileSpec = Union[str, EncodingProfile, Mapping[str, Union[str, EncodingProfile]]]
+
+
+@dataclass
+class DataMask:
+    """Valid data mask of a subdataset, recorded while creating its COG.
+
+    Attributes:
+        mask (Any): 2D numpy uint8 array holding 1 for data pixels and 0 for
+            nodata pixels of the COG
+        transform (List[float]): Georeferencing transformation matrix of the COG
+    """
+
+    mask: Any
+    transform: List[float]
+
+
+@dataclass
+class ProfileBenchmark:
+    """Encoding time and size of one COG with one encoding profile.
+
+    Attributes:
+        asset (str): COG asset name, i.e., the subdataset name with a '_fill'
+            suffix for fill value COGs
+        profile (str): Encoding profile name
+        seconds (float): Time taken to encode the COG
+        size (int): COG file size in bytes
+    """
+
+    asset: str
+    profile: str
+    seconds: float
+    size: int
+
+
+def subdataset_assets(product: str) -> List[str]:
+    """Returns the asset keys of the subdatasets of a VIIRS product, i.e., the
+    fragment asset keys less those of fill value COGs, which are written along
+    with their subdataset.
+
+    Args:
+        product (str): VIIRS product, e.g., 'VNP13A1'
+
+    Returns:
+        List[str]: The subdataset asset keys
+    """
+    multiple = MULTIPLE_NODATA.get(product, {})
+    return [
+        key
+        for key in STACFragments(product).assets
+        if not (key.endswith("_fill") and key[: -len("_fill")] in multiple)
+    ]
+
+
+def check_assets(products: Sequence[str], assets: Sequence[str]) -> None:
+    """Checks that asset keys name subdatasets of at least one VIIRS product.
+
+    Unsupported products are ignored, so that they are reported when their H5
+    files are converted.
+
+    Args:
+        products (Sequence[str]): VIIRS products, e.g., ['VNP13A1']
+        assets (Sequence[str]): Asset keys to check
+
+    Raises:
+        ValueError: If an asset key is not a subdataset asset key of any of the
+            supported products
+    """
+    products = [product for product in products if _is_supported(product)]
+    if not assets or not products:
+        return
+    known = {key for product in products for key in subdataset_assets(product)}
+    unknown = [asset for asset in assets if asset not in known]
+    if unknown:
+        raise ValueError(
+            f"Unknown asset(s) for {', '.join(products)}: {', '.join(unknown)}. "
+            f"Expected any of: {', '.join(sorted(known))}"
+        )
+
+
+def _is_supported(product: str) -> bool:
+    try:
+        check_if_supported(product)
+    except UnsupportedProduct:
+        return False
+    return True
+
+
+def encoding_profile(
+    product: str, profile: Optional[ProfileSpec] = None
+) -> EncodingProfile:
+    """Resolves the COG encoding profile for a VIIRS product.
+
+    Args:
+        product (str): VIIRS product, e.g., 'VNP13A1'
+        profile (ProfileSpec, optional): An encoding profile or the name of
+            one in ``COG_PROFILES``, or a dictionary of either keyed by
+            product, with an optional '*' key for all other products. The
+            default profile is used if not given.
+
+    Returns:
+        EncodingProfile: The encoding profile
+    """
+    if isinstance(profile, Mapping):
+        profile = profile.get(product, profile.get("*"))
+    if profile is None:
+        profile = DEFAULT_COG_PROFILE
+    if isinstance(profile, str):
+        if profile not in COG_PROFILES:
+            raise ValueError(
+                f"Unknown COG profile '{profile}', "
+                f"expected one of: {', '.join(COG_PROFILES)}"
+            )
+        return COG_PROFILES[profile]
+    return profile
+
+
+def parse_profiles(
+    values: Sequence[str], num_threads: Optional[str] = None
+) -> Dict[str, EncodingProfile]:
+    """Parses COG encoding profile selections, e.g., from the command line.
+
+    Args:
+        values (Sequence[str]): Profile names, each optionally prefixed by a
+            product and '=', e.g., 'zstd' or 'VNP13A1=deflate-predictor'. A
+            name without a product applies to all other products.
+        num_threads (str, optional): Number of compression threads, an
+            integer or 'ALL_CPUS', set on every selected profile
+
+    Returns:
+        Dict[str, EncodingProfile]: Profiles keyed by product, with a '*' key
+        for all other products, for use with :func:`encoding_profile`
+    """
+    profiles: Dict[str, EncodingProfile] = {}
+    for value in values:
+        product, _, name = value.rpartition("=")
+        profiles[product.upper() or "*"] = encoding_profile("", name)
+    if num_threads:
+        if num_threads.upper() == "ALL_CPUS":
+            num_threads = "ALL_CPUS"
+        elif not num_threads.isdigit() or int(num_threads) < 1:
+            raise ValueError(
+                f"Invalid number of threads '{num_threads}', "
+                "expected a positive integer or ALL_CPUS"
+            )
+        profiles.setdefault("*", encoding_profile(""))
+        profiles = {
+            key: replace(profile, num_threads=num_threads)
+            for key, profile in profiles.items()
+        }
+    return profiles
+
+
 @ignore_not_georeferenced()
-def cogify(infile: str, outdir: str) -> List[str]:
+def cogify(
+    infile: str,
+    outdir: str,
+    workers: int = 1,
+    block_rows: Optional[int] = None,
+    metadata: Optional[Metadata] = None,
+    data_masks: Optional[Dict[str, DataMask]] = None,
+    profile: Optional[ProfileSpec] = None,
+    band_mode: str = "multiband",
+    assets: Optional[Sequence[str]] = None,
+    exclude_assets: Optional[Sequence[str]] = None,
+    skip_existing: bool = False,
+) -> List[str]:
     """Creates COGs for the provided HDF5 file.
 
     COGs are created using h5py as the data reader to avoid rasterio and/or GDAL
-    silently converting int8 (signed byte) data to uint8 (byte).
+    silently converting int8 (signed byte) data to uint8 (byte). int8 data is
+    written as native Int8 COGs with GDAL 3.7 or later, and is converted to
+    int16 otherwise (see ``utils.gdal_supports_int8``). The H5 file is opened
+    once for all subdatasets.
+
+    Subdatasets may be encoded to COGs concurrently by passing ``workers`` > 1.
+    Subdatasets read in full are read in the calling thread, and no more than
+    ``workers`` of them are held in memory awaiting encoding at any one time.
+
+    If ``block_rows`` is given, subdatasets are streamed rather than read in
+    full: blocks of rows are read from the H5 file and written to a tiled GTiff
+    in a temporary directory, from which the COG and its overviews are built.
+    Memory use per subdataset is then bounded by the block size rather than the
+    grid size. Streamed blocks are read in the worker threads, alongside reads
+    in the calling thread. h5py's global lock serializes the reads themselves,
+    while the GTiff writes and COG encoding of different subdatasets overlap.
+
+    3-D subdatasets are always streamed, one band at a time, so memory use is
+    bounded by a single band (or block of a band). They are written either to
+    a multi-band COG or to a single band COG per band, named with a
+    '_band<n>' suffix.
+
+    If ``skip_existing`` is set, a manifest of the COGs is kept alongside them
+    (see ``manifest.CogManifest``), and subdatasets whose COGs are recorded as
+    up to date with the H5 file and encoding options, and pass a header-only
+    validity check, are not read or encoded again. Each COG is recorded as soon
+    as it is written, so after a failure a re-run only creates the remaining
+    COGs.
 
     Args:
         infile (str): The input H5 file
         outdir (str): The output directory
+        workers (int): Number of threads used to encode COGs. Default is 1.
+        block_rows (int, optional): Number of rows per block when streaming
+            subdatasets. Rounded up to a multiple of the H5 chunk height.
+            Subdatasets are read in full if not given.
+        metadata (Metadata, optional): Metadata previously extracted from the
+            input H5 file. Extracted from the H5 file if not given.
+        data_masks (Dict[str, DataMask], optional): If given, the valid data
+            masks of the subdatasets used for data footprints (see
+            ``constants.FOOTPRINT_DATA_ASSETS``) are added to this dictionary,
+            keyed by subdataset name, while the subdatasets are in memory.
+            Passing them to ``stac.create_item`` avoids reading the COGs again.
+        profile (ProfileSpec, optional): COG encoding profile, profile name,
+            or dictionary of either keyed by product (see
+            :func:`encoding_profile`). Default is 'deflate'.
+        band_mode (str): Choice of 'multiband' to write each 3-D subdataset to
+            a multi-band COG or 'split' to write each band to its own COG.
+            Default is 'multiband'.
+        assets (Sequence[str], optional): Asset keys of the subdatasets to
+            convert (see :func:`subdataset_assets`). All subdatasets are
+            converted if not given. The fill value COG of a subdataset with
+            multiple nodata values is written along with it.
+        exclude_assets (Sequence[str], optional): Asset keys of subdatasets
+            not to convert. Excluded and unselected subdatasets are not read.
+        skip_existing (bool): Flag to skip subdatasets whose COGs are up to
+            date according to the COG manifest, and to update the manifest.
+            Default is False.
 
     Returns:
         List[str]: The COG hrefs
+
+    Raises:
+        ValueError: If ``assets`` or ``exclude_assets`` hold a key that is not
+            a subdataset asset key of the product
     """
-    metadata = viirs_metadata(infile)
+    if band_mode not in BAND_MODES:
+        raise ValueError(
+            f"Unknown band mode '{band_mode}', expected one of: "
+            f"{', '.join(BAND_MODES)}"
+        )
+    if metadata is None:
+        metadata = viirs_metadata(infile)
+    if assets is not None or exclude_assets:
+        check_assets([metadata.product], [*(assets or []), *(exclude_assets or [])])
     base_filename = os.path.splitext(os.path.basename(infile))[0]
 
-    all_keys: List[str] = []
-    with h5py.File(infile) as h5:
-        h5.visit(all_keys.append)
-        subdataset_keys = [
-            key
-            for key in all_keys
-            if isinstance(h5[key], h5py.Dataset) and "GRIDS" in key
-        ]
-
-    cog_paths = []
-    for subdataset_key in subdataset_keys:
-        sanitized_key = subdataset_key.replace(" ", "_")
-        rasterio_subdataset_path = f"HDF5:{infile}://{sanitized_key}"
-
-        parts = sanitized_key.split("/")
-        subdataset_name = parts[-1]
-        cog_filename = f"{base_filename}_{subdataset_name}.tif"
-        cog_path = os.path.join(outdir, cog_filename)
-
-        with rasterio.open(rasterio_subdataset_path, "r") as tag_src:
-            rasterio_tags = tag_src.tags()
-
-        with h5py.File(infile) as h5:
-            data: Any = np.array(h5[subdataset_key])
-            if len(data.shape) == 1:  # skip single value (non-data) "grids"
-                continue
-            if len(data.shape) == 3:
-                raise ValueError(
-                    f"MultiBand COG creation not supported for {metadata.product}"
-                )
+    footprint_assets = FOOTPRINT_DATA_ASSETS.get(metadata.product, [])
+    encoding = encoding_profile(metadata.product, profile)
+    manifest = CogManifest(infile, outdir) if skip_existing else None
 
-            # gdal (and software built on gdal) doesn't always play well with signed byte data
-            data = np.int16(data) if data.dtype == "int8" else data
+    cog_paths: List[str] = []
+    futures: List["Future[None]"] = []
+    pending: Set["Future[None]"] = set()
+    with Granule(infile) as granule, ThreadPoolExecutor(workers) as executor:
 
-            temp = None
-            if "_FillValue" in h5[subdataset_key].attrs.keys():
-                temp = h5[subdataset_key].attrs["_FillValue"].item()
-            elif "_Fillvalue" in h5[subdataset_key].attrs.keys():
-                temp = h5[subdataset_key].attrs["_Fillvalue"].item()
-            nodata = None if temp == b"n/a" else temp
+        def submit(
+            paths: List[str],
+            output: Dict[str, Any],
+            func: Callable[..., None],
+            *args: Any,
+        ) -> None:
+            nonlocal pending
+            if len(pending) >= workers:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if manifest:
+                args = (manifest, paths, output, func, *args)
+                func = _recorded
+            future = executor.submit(func, *args)
+            futures.append(future)
+            pending.add(future)
+
+        def is_current(paths: List[str], output: Dict[str, Any]) -> bool:
+            if manifest and all(manifest.is_current(p, output) for p in paths):
+                logger.info(f"Skipping up to date COG(s): {', '.join(paths)}")
+                return True
+            return False
+
+        for subdataset in granule.subdatasets:
+            if len(subdataset.shape) == 1:  # skip single value (non-data) "grids"
+                continue
+            if (assets is not None and subdataset.name not in assets) or (
+                exclude_assets and subdataset.name in exclude_assets
+            ):
+                continue
 
             multiple = MULTIPLE_NODATA.get(metadata.product, {}).get(
-                subdataset_name, None
+                subdataset.name, None
             )
-            if multiple:
-                nodatas = cast(List[int], multiple["multiple"])
-                nodata_new = cast(int, multiple["new"])
-                clean_data, clean_nodata = _clean(data, nodatas, nodata_new)
-                nodata_cog_path = f"{os.path.splitext(cog_path)[0]}_fill.tif"
-                _cog(
-                    clean_data,
-                    metadata.crs,
-                    metadata.transform,
-                    rasterio_tags,
-                    cog_path,
-                    nodata_new,
-                )
-                cog_paths.append(cog_path)
-                _cog(
-                    clean_nodata,
-                    metadata.crs,
-                    metadata.transform,
-                    rasterio_tags,
-                    nodata_cog_path,
-                    nodata_new,
-                )
-                cog_paths.append(nodata_cog_path)
+            nodata = _cog_nodata(subdataset, multiple)
+            transform = metadata.grid_transform(subdataset.grid)
+            dtype = _prepared_dtype(subdataset.dtype)
+            options = encoding.creation_options(dtype)
+            # recorded with the options, so a change of output data type or
+            # nodata, e.g., with native int8 support, recreates the COGs
+            output = dict(options, dtype=np.dtype(dtype).name, nodata=nodata)
+
+            if len(subdataset.shape) == 3:
+                bands = list(range(subdataset.band_count))
+                if band_mode == "split":
+                    layers = [([b], f"{subdataset.name}_band{b + 1}") for b in bands]
+                else:
+                    layers = [(bands, subdataset.name)]
+                for layer_bands, name in layers:
+                    paths = _cog_paths(outdir, base_filename, name, multiple)
+                    cog_paths.extend(paths)
+                    if is_current(paths, output):
+                        continue
+                    submit(
+                        paths,
+                        output,
+                        _cog_blocks,
+                        _prepare_blocks(
+                            granule,
+                            subdataset,
+                            block_rows or subdataset.band_shape[0],
+                            multiple,
+                            bands=layer_bands,
+                        ),
+                        subdataset.band_shape,
+                        dtype,
+                        metadata.crs,
+                        transform,
+                        granule.tags,
+                        paths,
+                        nodata,
+                        options,
+                        len(layer_bands),
+                    )
+                continue
+
+            paths = _cog_paths(outdir, base_filename, subdataset.name, multiple)
+            cog_paths.extend(paths)
+            if is_current(paths, output):
+                continue
+
+            mask = None
+            if data_masks is not None and subdataset.name in footprint_assets:
+                mask = np.zeros(subdataset.shape, dtype=np.uint8)
+                data_masks[subdataset.name] = DataMask(mask, transform)
+
+            if block_rows is None:
+                arrays = _prepare(granule.read(subdataset), multiple)
+                if mask is not None:
+                    _fill_mask(mask, 0, arrays[0], nodata)
+                for array, path in zip(arrays, paths):
+                    submit(
+                        [path],
+                        output,
+                        _cog,
+                        array,
+                        metadata.crs,
+                        transform,
+                        granule.tags,
+                        path,
+                        nodata,
+                        options,
+                    )
             else:
-                _cog(
-                    data,
+                submit(
+                    paths,
+                    output,
+                    _cog_blocks,
+                    _prepare_blocks(
+                        granule, subdataset, block_rows, multiple, mask, nodata
+                    ),
+                    subdataset.shape,
+                    dtype,
                     metadata.crs,
-                    metadata.transform,
-                    rasterio_tags,
-                    cog_path,
+                    transform,
+                    granule.tags,
+                    paths,
                     nodata,
+                    options,
                 )
-                cog_paths.append(cog_path)
+
+        for future in futures:
+            future.result()
 
     return cog_paths
 
 
+@ignore_not_georeferenced()
+def benchmark_profiles(
+    infile: str,
+    profiles: Optional[Dict[str, EncodingProfile]] = None,
+    metadata: Optional[Metadata] = None,
+) -> List[ProfileBenchmark]:
+    """Times the encoding of each subdataset COG of an H5 file with each
+    encoding profile.
+
+    Each subdataset is read once and encoded with every profile to a COG in a
+    temporary directory, which is deleted. Reading the H5 file is not timed.
+    3-D subdatasets are read in full and encoded to multi-band COGs.
+
+    Args:
+        infile (str): The input H5 file
+        profiles (Dict[str, EncodingProfile], optional): Encoding profiles
+            keyed by name. Default is all ``COG_PROFILES``.
+        metadata (Metadata, optional): Metadata previously extracted from the
+            input H5 file. Extracted from the H5 file if not given.
+
+    Returns:
+        List[ProfileBenchmark]: Encoding time and COG size for each COG and
+        profile
+    """
+    if profiles is None:
+        profiles = COG_PROFILES
+    if metadata is None:
+        metadata = viirs_metadata(infile)
+
+    results: List[ProfileBenchmark] = []
+    with Granule(infile) as granule, TemporaryDirectory() as tmp_dir:
+        for subdataset in granule.subdatasets:
+            if len(subdataset.shape) == 1:
+                continue
+
+            multiple = MULTIPLE_NODATA.get(metadata.product, {}).get(
+                subdataset.name, None
+            )
+            nodata = _cog_nodata(subdataset, multiple)
+            transform = metadata.grid_transform(subdataset.grid)
+            if len(subdataset.shape) == 3:
+                data = np.stack(
+                    [
+                        granule.read_band(subdataset, band)
+                        for band in range(subdataset.band_count)
+                    ]
+                )
+            else:
+                data = granule.read(subdataset)
+            arrays = _prepare(data, multiple)
+            assets = [subdataset.name, f"{subdataset.name}_fill"]
+            for asset, array in zip(assets, arrays):
+                for name, profile in profiles.items():
+                    path = os.path.join(tmp_dir, f"{asset}_{name}.tif")
+                    start = time.perf_counter()
+                    _cog(
+                        array,
+                        metadata.crs,
+                        transform,
+                        granule.tags,
+                        path,
+                        nodata,
+                        profile.creation_options(array.dtype),
+                    )
+                    seconds = time.perf_counter() - start
+                    results.append(
+                        ProfileBenchmark(asset, name, seconds, os.path.getsize(path))
+                    )
+                    os.remove(path)
+
+    return results
+
+
+def _recorded(
+    manifest: CogManifest,
+    paths: List[str],
+    options: Dict[str, Any],
+    func: Callable[..., None],
+    *args: Any,
+) -> None:
+    """Writes COGs with ``func`` and records them in the manifest."""
+    func(*args)
+    manifest.record(paths, options)
+
+
+def _prepare(data: Any, multiple: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    """Converts subdataset data to the array(s) written to COGs.
+
+    Returns a single array, or a pair of cleaned data and fill value arrays if
+    the subdataset has multiple nodata values.
+    """
+    if _prepared_dtype(data.dtype) != data.dtype:
+        data = np.int16(data)
+    if multiple:
+        nodatas = cast(List[int], multiple["multiple"])
+        return _clean(data, nodatas, _new_nodata(multiple, data.dtype))
+    return (data,)
+
+
+def _prepare_blocks(
+    granule: Granule,
+    subdataset: Subdataset,
+    block_rows: int,
+    multiple: Optional[Dict[str, Any]],
+    mask: Optional[Any] = None,
+    nodata: Optional[Union[int, float]] = None,
+    bands: Optional[List[int]] = None,
+) -> Iterator[Tuple[int, int, Tuple[Any, ...]]]:
+    """Reads and converts a subdataset, or the given bands of a 3-D subdataset
+    one band after another, in blocks of rows.
+
+    Yields the COG band number, the first row and the COG array(s) of each
+    block.
+    """
+    layers: List[Optional[int]] = [None] if bands is None else list(bands)
+    for number, band in enumerate(layers, start=1):
+        for row, block in granule.read_blocks(subdataset, block_rows, band):
+            arrays = _prepare(block, multiple)
+            if mask is not None:
+                _fill_mask(mask, row, arrays[0], nodata)
+            yield number, row, arrays
+
+
+def _fill_mask(
+    mask: Any, row: int, data: Any, nodata: Optional[Union[int, float]]
+) -> None:
+    """Sets the valid data mask rows covered by a block of COG data, matching
+    the data mask of ``RasterFootprint``."""
+    stop = row + data.shape[0]
+    if nodata is None:
+        mask[row:stop] = 1
+    elif np.isnan(nodata):
+        mask[row:stop] = ~np.isnan(data)
+    else:
+        mask[row:stop] = data != nodata
+
+
+def _prepared_dtype(dtype: Any) -> Any:
+    # gdal before 3.7 (and software built on it) reads signed byte data as unsigned
+    if dtype == "int8" and not gdal_supports_int8():
+        return np.dtype("int16")
+    return dtype
+
+
+def _cog_paths(
+    outdir: str, base_filename: str, name: str, multiple: Optional[Dict[str, Any]]
+) -> List[str]:
+    """Returns the path of a COG and, with multiple nodata values, of its fill
+    value COG."""
+    cog_path = os.path.join(outdir, f"{base_filename}_{name}.tif")
+    if multiple:
+        return [cog_path, f"{os.path.splitext(cog_path)[0]}_fill.tif"]
+    return [cog_path]
+
+
+def _cog_nodata(
+    subdataset: Subdataset, multiple: Optional[Dict[str, Any]]
+) -> Optional[Union[int, float]]:
+    """Returns the nodata value of the COG(s) of a subdataset."""
+    if multiple:
+        return _new_nodata(multiple, _prepared_dtype(subdataset.dtype))
+    return subdataset.nodata
+
+
+def _new_nodata(multiple: Dict[str, Any], dtype: Any) -> int:
+    """Returns the single nodata value replacing multiple nodata values in data
+    of the given type."""
+    if dtype == "int8" and "new_int8" in multiple:
+        return cast(int, multiple["new_int8"])
+    return cast(int, multiple["new"])
+
+
 def _cog(
     data: Any,
     crs: str,
     transform: List[float],
     tags: Dict[str, Any],
     cog_path: str,
-    nodata: Optional[int] = None,
+    nodata: Optional[Union[int, float]] = None,
+    options: Optional[Dict[str, Any]] = None,
 ) -> None:
+    """Writes a 2-D array, or a 3-D array of bands, to a COG."""
     src_profile = dict(
         driver="GTiff",
         dtype=data.dtype,
         nodata=nodata,
-        count=1,
-        height=data.shape[0],
-        width=data.shape[1],
+        count=data.shape[0] if data.ndim == 3 else 1,
+        height=data.shape[-2],
+        width=data.shape[-1],
         crs=crs,
         transform=rasterio.Affine(*transform),
     )
 
     with MemoryFile() as mem_file:
         with mem_file.open(**src_profile) as mem:
-            mem.write(data, 1)
+            if data.ndim == 3:
+                mem.write(data)
+            else:
+                mem.write(data, 1)
             mem.update_tags(**tags)
-            rasterio.shutil.copy(mem, cog_path, **COG_PROFILE)
+            rasterio.shutil.copy(mem, cog_path, **(options or COG_PROFILE))
+
+
+def _cog_blocks(
+    blocks: Iterable[Tuple[int, int, Tuple[Any, ...]]],
+    shape: Tuple[int, ...],
+    dtype: Any,
+    crs: str,
+    transform: List[float],
+    tags: Dict[str, Any],
+    cog_paths: List[str],
+    nodata: Optional[Union[int, float]] = None,
+    options: Optional[Dict[str, Any]] = None,
+    count: int = 1,
+) -> None:
+    """Writes row blocks of one or more arrays to COGs.
+
+    The blocks are written to tiled GTiffs in a temporary directory so that the
+    full arrays are never held in memory. Each block holds the band number and
+    first row of the block, and one array per COG. Multi-band GTiffs are band
+    interleaved so that bands may be written one after another.
+    """
+    options = options or COG_PROFILE
+    src_profile = dict(
+        driver="GTiff",
+        dtype=dtype,
+        nodata=nodata,
+        count=count,
+        height=shape[0],
+        width=shape[1],
+        crs=crs,
+        transform=rasterio.Affine(*transform),
+        tiled=True,
+        blockxsize=options["blocksize"],
+        blockysize=options["blocksize"],
+    )
+    if count > 1:
+        src_profile["interleave"] = "band"
+
+    with TemporaryDirectory() as tmp_dir:
+        tmp_paths = [os.path.join(tmp_dir, os.path.basename(p)) for p in cog_paths]
+        with ExitStack() as stack:
+            tmps = [
+                stack.enter_context(rasterio.open(path, "w", **src_profile))
+                for path in tmp_paths
+            ]
+            for band, row, arrays in blocks:
+                for tmp, array in zip(tmps, arrays):
+                    window = Window(0, row, shape[1], array.shape[0])
+                    tmp.write(array, band, window=window)
+            for tmp in tmps:
+                tmp.update_tags(**tags)
+
+        for tmp_path, cog_path in zip(tmp_paths, cog_paths):
+            with rasterio.open(tmp_path) as tmp:
+                rasterio.shutil.copy(tmp, cog_path, **options)
 
 
 def _clean(data: Any, nodatas: List[int], nodata_new: int) -> Tuple[Any, Any]:
-    np.ma.asarray(data)
-    for nodata in nodatas:
-        data = np.ma.masked_equal(data, nodata)
-    clean_data = np.ma.filled(data, nodata_new)
+    """Splits data with multiple nodata values into a data array with a single
+    nodata value and an array holding the original nodata values.
 
-    mask = np.ma.getmaskarray(data)
-    clean_nodata = np.ma.getdata(data)
-    clean_nodata[~mask] = nodata_new
+    The data array is modified in place and returned as the clean data array.
 
-    return (clean_data, clean_nodata)
+    Args:
+        data (Any): Numpy array of subdataset values
+        nodatas (List[int]): The nodata values present in the data
+        nodata_new (int): The single nodata value for both returned arrays
+
+    Returns:
+        Tuple[Any, Any]: The clean data array and the original nodata array
+    """
+    mask = _nodata_mask(data, nodatas)
+    clean_nodata = np.full_like(data, nodata_new)
+    np.copyto(clean_nodata, data, where=mask)
+    np.putmask(data, mask, nodata_new)
+    return (data, clean_nodata)
+
+
+def _nodata_mask(data: Any, nodatas: List[int]) -> Any:
+    """Returns a boolean mask of the data equal to any of the nodata values.
+
+    Native 8 and 16 bit integer data is masked in a single pass by indexing a
+    lookup table with the data values. Other data falls back to ``np.isin``.
+    """
+    dtype = data.dtype
+    if dtype.kind in "iu" and dtype.itemsize <= 2 and dtype.isnative:
+        info = np.iinfo(dtype)
+        values = np.array([v for v in nodatas if info.min <= v <= info.max], dtype)
+        unsigned = np.dtype(f"u{dtype.itemsize}")
+        lookup = np.zeros(2 ** (8 * dtype.itemsize), dtype=bool)
+        lookup[values.view(unsigned)] = True
+        return lookup[data.view(unsigned)]
+    return np.isin(data, nodatas)
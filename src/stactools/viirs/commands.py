@@ -1,18 +1,22 @@
-import glob
 import os
-from collections import defaultdict
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
 
 import click
 from click import Command, Group
-from pystac import CatalogType
-from stactools.core.utils.antimeridian import Strategy
 
-from stactools.viirs import cog, constants, stac
+from stactools.viirs import constants
+
+if TYPE_CHECKING:
+    from stactools.viirs.cog import EncodingProfile
 
 
 def create_viirs_command(cli: Group) -> Command:
-    """Creates the stactools-viirs command line utility."""
+    """Creates the stactools-viirs command line utility.
+
+    Modules that pull in h5py, rasterio or shapely are imported inside the
+    commands so that loading the plugin, which the stactools CLI does on every
+    invocation, stays cheap.
+    """
 
     @cli.group(
         "viirs",
@@ -24,7 +28,72 @@ def create_viirs_command(cli: Group) -> Command:
     @viirs.command("create-cogs", short_help="Create subdataset COGs")
     @click.argument("INFILE")
     @click.option("-o", "--outdir", help="Directory for COG files")
-    def create_cogs(infile: str, outdir: Optional[str]) -> None:
+    @click.option(
+        "-w",
+        "--workers",
+        help="Number of threads used to encode COGs",
+        default=1,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "-b",
+        "--block-rows",
+        help="Stream subdatasets to COGs in blocks of this many rows to limit memory use",
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "-p",
+        "--cog-profile",
+        "cog_profiles",
+        multiple=True,
+        help=(
+            "COG encoding profile: deflate (default), deflate-predictor, zstd "
+            "or lerc. Prefix with PRODUCT= to select per product. Repeatable."
+        ),
+    )
+    @click.option(
+        "--cog-threads",
+        help="Number of threads GDAL uses to compress each COG, or ALL_CPUS",
+    )
+    @click.option(
+        "--band-mode",
+        type=click.Choice(constants.BAND_MODES, case_sensitive=False),
+        default="multiband",
+        show_default=True,
+        help="Write 3-D subdatasets to multi-band COGs or to a COG per band",
+    )
+    @click.option(
+        "--asset",
+        "assets",
+        multiple=True,
+        help="Only convert the subdataset with this asset key. Repeatable.",
+    )
+    @click.option(
+        "--exclude-asset",
+        "exclude_assets",
+        multiple=True,
+        help="Do not convert the subdataset with this asset key. Repeatable.",
+    )
+    @click.option(
+        "--skip-existing",
+        is_flag=True,
+        help="Skip COGs recorded as up to date in the COG manifest",
+        default=False,
+        show_default=True,
+    )
+    def create_cogs(
+        infile: str,
+        outdir: Optional[str],
+        workers: int,
+        block_rows: Optional[int],
+        cog_profiles: Tuple[str, ...],
+        cog_threads: Optional[str],
+        band_mode: str,
+        assets: Tuple[str, ...],
+        exclude_assets: Tuple[str, ...],
+        skip_existing: bool,
+    ) -> None:
         """Creates a COG for each subdataset in an H5 file.
 
         \b
@@ -32,10 +101,44 @@ def create_viirs_command(cli: Group) -> Command:
             infile (str): HREF to a VIIRS H5 file
             outdir (str, optional): The directory that will contain the COGs. If
             not specified, the COGs will be saved to the H5 directory.
+            workers (int): Number of threads used to encode COGs. Default is 1.
+            block_rows (int, optional): If given, subdatasets are streamed to
+                the COGs in blocks of this many rows rather than read in full.
+            cog_profiles (Tuple[str, ...]): COG encoding profile names, each
+                optionally prefixed by a product and '=' to apply to that
+                product only. Default is 'deflate'.
+            cog_threads (str, optional): Number of threads GDAL uses to
+                compress each COG, an integer or 'ALL_CPUS'.
+            band_mode (str): Choice of 'multiband' to write 3-D subdatasets
+                to multi-band COGs or 'split' to write a COG per band. Default
+                is 'multiband'.
+            assets (Tuple[str, ...]): Asset keys of the subdatasets to convert
+                to COGs. All subdatasets are converted if not given.
+            exclude_assets (Tuple[str, ...]): Asset keys of the subdatasets not
+                to convert to COGs.
+            skip_existing (bool): Flag to keep a manifest of the COGs created
+                for each H5 file alongside them, and skip COGs that are
+                recorded as up to date and pass a header-only check. Default
+                is False.
         """
+        from stactools.viirs import cog
+        from stactools.viirs.utils import product_from_h5
+
+        profiles = _cog_profiles(cog_profiles, cog_threads)
+        _check_assets([product_from_h5(infile)], assets, exclude_assets)
         if outdir is None:
             outdir = os.path.dirname(infile)
-        cog.cogify(infile, outdir)
+        cog.cogify(
+            infile,
+            outdir,
+            workers=workers,
+            block_rows=block_rows,
+            profile=profiles,
+            band_mode=band_mode.lower(),
+            assets=assets or None,
+            exclude_assets=exclude_assets,
+            skip_existing=skip_existing,
+        )
 
         return None
 
@@ -82,9 +185,96 @@ def create_viirs_command(cli: Group) -> Command:
         default=False,
         show_default=True,
     )
+    @click.option(
+        "--footprint-pixel-size",
+        help=(
+            "Maximum pixel size, in degrees, of the data read for the data "
+            "footprint; the coarsest COG overview within it is used"
+        ),
+        type=click.FloatRange(min=0, min_open=True),
+    )
     @click.option(
         "-f", "--file-list", help="File containing list of subdataset COG HREFs"
     )
+    @click.option(
+        "-w",
+        "--workers",
+        help="Number of threads used to encode COGs",
+        default=1,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "-b",
+        "--block-rows",
+        help="Stream subdatasets to COGs in blocks of this many rows to limit memory use",
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "--header-only",
+        is_flag=True,
+        help="Read only the H5 header, with ranged reads, to extract metadata",
+        default=False,
+        show_default=True,
+    )
+    @click.option(
+        "--header-block-size",
+        help="Bytes per ranged read in header-only mode",
+        default=constants.HEADER_BLOCK_SIZE,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "--header-max-blocks",
+        help="Number of blocks cached in header-only mode",
+        default=constants.HEADER_MAX_BLOCKS,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "--metadata-cache",
+        help="SQLite file caching metadata extracted from H5 files between runs",
+    )
+    @click.option(
+        "-p",
+        "--cog-profile",
+        "cog_profiles",
+        multiple=True,
+        help=(
+            "COG encoding profile: deflate (default), deflate-predictor, zstd "
+            "or lerc. Prefix with PRODUCT= to select per product. Repeatable."
+        ),
+    )
+    @click.option(
+        "--cog-threads",
+        help="Number of threads GDAL uses to compress each COG, or ALL_CPUS",
+    )
+    @click.option(
+        "--band-mode",
+        type=click.Choice(constants.BAND_MODES, case_sensitive=False),
+        default="multiband",
+        show_default=True,
+        help="Write 3-D subdatasets to multi-band COGs or to a COG per band",
+    )
+    @click.option(
+        "--asset",
+        "assets",
+        multiple=True,
+        help="Only convert the subdataset with this asset key. Repeatable.",
+    )
+    @click.option(
+        "--exclude-asset",
+        "exclude_assets",
+        multiple=True,
+        help="Do not convert the subdataset with this asset key. Repeatable.",
+    )
+    @click.option(
+        "--skip-existing",
+        is_flag=True,
+        help="Skip COGs recorded as up to date in the COG manifest",
+        default=False,
+        show_default=True,
+    )
     def create_item_command(
         infile: str,
         outdir: str,
@@ -93,7 +283,20 @@ def create_viirs_command(cli: Group) -> Command:
         densification_factor: int,
         simplification_tolerance: float,
         use_data_footprint: bool,
+        footprint_pixel_size: Optional[float] = None,
         file_list: Optional[str] = None,
+        workers: int = 1,
+        block_rows: Optional[int] = None,
+        header_only: bool = False,
+        header_block_size: int = constants.HEADER_BLOCK_SIZE,
+        header_max_blocks: int = constants.HEADER_MAX_BLOCKS,
+        metadata_cache: Optional[str] = None,
+        cog_profiles: Tuple[str, ...] = (),
+        cog_threads: Optional[str] = None,
+        band_mode: str = "multiband",
+        assets: Tuple[str, ...] = (),
+        exclude_assets: Tuple[str, ...] = (),
+        skip_existing: bool = False,
     ) -> None:
         """Creates a STAC Item based on an H5 VIIRS data file and, if it exists,
         the corresponding XML metadata file.
@@ -123,18 +326,94 @@ def create_viirs_command(cli: Group) -> Command:
             use_data_footprint (bool): Flag to extract footprint geometry based
                 on data existence rather than the raster outline. Default is
                 False.
+            footprint_pixel_size (float, optional): Maximum pixel size, in
+                degrees, of the data mask the data footprint is extracted from.
+                The footprint is extracted from the coarsest COG overview level
+                within this size, so its boundary moves by up to about one
+                overview pixel. Full resolution is used if not given.
             file_list (str, optional): Text file containing one HREF per line.
                 The HREFs should point to subdataset COG files.
+            workers (int): Number of threads used to encode COGs when
+                create_cogs is set. Default is 1.
+            block_rows (int, optional): If given, subdatasets are streamed to
+                the COGs in blocks of this many rows rather than read in full.
+            header_only (bool): Flag to extract metadata by fetching only the
+                blocks holding the H5 header with ranged reads. The number of
+                bytes read is reported. Cannot be combined with create_cogs.
+                Default is False.
+            header_block_size (int): Size in bytes of each ranged read in
+                header-only mode. Default is 65536.
+            header_max_blocks (int): Number of blocks held in the block cache
+                in header-only mode. Default is 32.
+            metadata_cache (str, optional): Path to an SQLite file caching
+                the metadata extracted from H5 files. Cached metadata is used
+                without reading the H5 file while the file is unchanged.
+            cog_profiles (Tuple[str, ...]): COG encoding profile names, each
+                optionally prefixed by a product and '=' to apply to that
+                product only. Default is 'deflate'.
+            cog_threads (str, optional): Number of threads GDAL uses to
+                compress each COG, an integer or 'ALL_CPUS'.
+            band_mode (str): Choice of 'multiband' to write 3-D subdatasets
+                to multi-band COGs or 'split' to write a COG per band. Default
+                is 'multiband'.
+            assets (Tuple[str, ...]): Asset keys of the subdatasets to convert
+                to COGs. All subdatasets are converted if not given.
+            exclude_assets (Tuple[str, ...]): Asset keys of the subdatasets not
+                to convert to COGs.
+            skip_existing (bool): Flag to keep a manifest of the COGs created
+                for each H5 file alongside them, and skip COGs that are
+                recorded as up to date and pass a header-only check. Default
+                is False.
         """
+        if header_only and create_cogs:
+            raise click.UsageError(
+                "--header-only cannot be combined with --create-cogs"
+            )
+        profiles = _cog_profiles(cog_profiles, cog_threads)
+
+        from stactools.core.utils.antimeridian import Strategy
+
+        from stactools.viirs import cog, stac
+        from stactools.viirs.cache import MetadataCache
+        from stactools.viirs.metadata import viirs_metadata
+        from stactools.viirs.ranged import HeaderOnly
+        from stactools.viirs.utils import product_from_h5
+
+        _check_assets([product_from_h5(infile)], assets, exclude_assets)
+
         strategy = Strategy[antimeridian_strategy.upper()]
+        metadata = viirs_metadata(
+            infile,
+            header_only=(
+                HeaderOnly(header_block_size, header_max_blocks)
+                if header_only
+                else None
+            ),
+            cache=MetadataCache(metadata_cache) if metadata_cache else None,
+        )
+        if metadata.bytes_read is not None:
+            click.echo(f"Read {metadata.bytes_read} bytes from {infile}", err=True)
 
         hrefs = None
+        data_masks: Dict[str, cog.DataMask] = {}
         if file_list:
             with open(file_list) as file:
                 hrefs = [line.strip() for line in file.readlines()]
         elif create_cogs:
             h5dir = os.path.dirname(infile)
-            hrefs = cog.cogify(infile, h5dir)
+            hrefs = cog.cogify(
+                infile,
+                h5dir,
+                workers=workers,
+                block_rows=block_rows,
+                metadata=metadata,
+                data_masks=data_masks if use_data_footprint else None,
+                profile=profiles,
+                band_mode=band_mode.lower(),
+                assets=assets or None,
+                exclude_assets=exclude_assets,
+                skip_existing=skip_existing,
+            )
 
         item = stac.create_item(
             infile,
@@ -143,6 +422,9 @@ def create_viirs_command(cli: Group) -> Command:
             densification_factor=densification_factor,
             simplification_tolerance=simplification_tolerance,
             use_data_footprint=use_data_footprint,
+            metadata=metadata,
+            data_masks=data_masks,
+            footprint_pixel_size=footprint_pixel_size,
         )
         item_path = os.path.join(outdir, f"{item.id}.json")
         item.set_self_href(item_path)
@@ -195,6 +477,101 @@ def create_viirs_command(cli: Group) -> Command:
         default=False,
         show_default=True,
     )
+    @click.option(
+        "--footprint-pixel-size",
+        help=(
+            "Maximum pixel size, in degrees, of the data read for the data "
+            "footprint; the coarsest COG overview within it is used"
+        ),
+        type=click.FloatRange(min=0, min_open=True),
+    )
+    @click.option(
+        "-j",
+        "--jobs",
+        help="Number of processes used to create Items",
+        default=1,
+        show_default=True,
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "-b",
+        "--block-rows",
+        help="Stream subdatasets to COGs in blocks of this many rows to limit memory use",
+        type=click.IntRange(min=1),
+    )
+    @click.option(
+        "--metadata-cache",
+        help="SQLite file caching metadata extracted from H5 files between runs",
+    )
+    @click.option(
+        "-i",
+        "--incremental",
+        is_flag=True,
+        help="Only create Items missing from existing Collections in OUTDIR",
+        default=False,
+        show_default=True,
+    )
+    @click.option(
+        "--check-modified",
+        is_flag=True,
+        help="With --incremental, also recreate Items of modified H5 files",
+        default=False,
+        show_default=True,
+    )
+    @click.option(
+        "--stream",
+        is_flag=True,
+        help="Validate and save each Item as soon as it is created",
+        default=False,
+        show_default=True,
+    )
+    @click.option(
+        "--item-format",
+        type=click.Choice(constants.ITEM_FORMATS, case_sensitive=False),
+        default="json",
+        show_default=True,
+        help="Save Items as JSON files, or in a single NDJSON or stac-geoparquet file",
+    )
+    @click.option(
+        "-p",
+        "--cog-profile",
+        "cog_profiles",
+        multiple=True,
+        help=(
+            "COG encoding profile: deflate (default), deflate-predictor, zstd "
+            "or lerc. Prefix with PRODUCT= to select per product. Repeatable."
+        ),
+    )
+    @click.option(
+        "--cog-threads",
+        help="Number of threads GDAL uses to compress each COG, or ALL_CPUS",
+    )
+    @click.option(
+        "--band-mode",
+        type=click.Choice(constants.BAND_MODES, case_sensitive=False),
+        default="multiband",
+        show_default=True,
+        help="Write 3-D subdatasets to multi-band COGs or to a COG per band",
+    )
+    @click.option(
+        "--asset",
+        "assets",
+        multiple=True,
+        help="Only convert the subdataset with this asset key. Repeatable.",
+    )
+    @click.option(
+        "--exclude-asset",
+        "exclude_assets",
+        multiple=True,
+        help="Do not convert the subdataset with this asset key. Repeatable.",
+    )
+    @click.option(
+        "--skip-existing",
+        is_flag=True,
+        help="Skip COGs recorded as up to date in the COG manifest",
+        default=False,
+        show_default=True,
+    )
     def create_collection_command(
         infile: str,
         outdir: str,
@@ -203,6 +580,20 @@ def create_viirs_command(cli: Group) -> Command:
         densification_factor: int,
         simplification_tolerance: float,
         use_data_footprint: bool,
+        footprint_pixel_size: Optional[float],
+        jobs: int,
+        block_rows: Optional[int],
+        metadata_cache: Optional[str],
+        incremental: bool,
+        check_modified: bool,
+        stream: bool,
+        item_format: str,
+        cog_profiles: Tuple[str, ...],
+        cog_threads: Optional[str],
+        band_mode: str,
+        assets: Tuple[str, ...],
+        exclude_assets: Tuple[str, ...],
+        skip_existing: bool,
     ) -> None:
         """Creates STAC Collections with Items for the VIIRS H5 HREFs listed in
         INFILE."
@@ -232,32 +623,119 @@ def create_viirs_command(cli: Group) -> Command:
             use_data_footprint (bool): Flag to extract footprint geometry based
                 on data existence rather than the raster outline. Default is
                 False.
+            footprint_pixel_size (float, optional): Maximum pixel size, in
+                degrees, of the data mask the data footprint is extracted from.
+                The footprint is extracted from the coarsest COG overview level
+                within this size, so its boundary moves by up to about one
+                overview pixel. Full resolution is used if not given.
+            jobs (int): Number of processes used to create Items (and COGs).
+                H5 files that fail are reported after the Collections are
+                saved. Default is 1.
+            block_rows (int, optional): If given, subdatasets are streamed to
+                the COGs in blocks of this many rows rather than read in full.
+            metadata_cache (str, optional): Path to an SQLite file caching
+                the metadata extracted from H5 files. Cached metadata is used
+                without reading the H5 files while they are unchanged.
+            incremental (bool): Flag to update existing Collections in outdir
+                rather than recreate them. Items are only created for H5 files
+                without an Item in the Collection, and the existing Items are
+                not read. Default is False.
+            check_modified (bool): Flag to also recreate the Items of H5 files
+                modified after their Item was written, in incremental mode.
+                Default is False.
+            stream (bool): Flag to validate and save each Item as soon as it
+                is created rather than once all Items are created, so Items
+                are not held in memory. Collections are saved last.
+                Incremental mode always streams Items. Default is False.
+            item_format (str): Choice of 'json' to save each Item to its own
+                file, 'ndjson' to stream the Items of each Collection to an
+                'items.ndjson' file alongside it, or 'geoparquet' to write
+                them to an 'items.parquet' file with a row group per tile.
+                NDJSON and stac-geoparquet files keep absolute Asset HREFs and
+                cannot be combined with incremental. Default is 'json'.
+            cog_profiles (Tuple[str, ...]): COG encoding profile names, each
+                optionally prefixed by a product and '=' to apply to that
+                product only. Default is 'deflate'.
+            cog_threads (str, optional): Number of threads GDAL uses to
+                compress each COG, an integer or 'ALL_CPUS'.
+            band_mode (str): Choice of 'multiband' to write 3-D subdatasets
+                to multi-band COGs or 'split' to write a COG per band. Default
+                is 'multiband'.
+            assets (Tuple[str, ...]): Asset keys of the subdatasets to convert
+                to COGs. All subdatasets are converted if not given.
+            exclude_assets (Tuple[str, ...]): Asset keys of the subdatasets not
+                to convert to COGs.
+            skip_existing (bool): Flag to keep a manifest of the COGs created
+                for each H5 file alongside them, and skip COGs that are
+                recorded as up to date and pass a header-only check. Default
+                is False.
         """
+        item_format = item_format.lower()
+        if incremental and item_format != "json":
+            raise click.UsageError(
+                "--incremental can only be used with the json Item format"
+            )
+        profiles = _cog_profiles(cog_profiles, cog_threads)
+
+        from pystac import CatalogType, Collection
+        from stactools.core.utils.antimeridian import Strategy
+
+        from stactools.viirs import stac
+        from stactools.viirs.cache import MetadataCache
+        from stactools.viirs.utils import product_from_h5
+
         with open(infile) as f:
             hrefs = [os.path.abspath(line.strip()) for line in f.readlines()]
+        _check_assets(
+            sorted({product_from_h5(href) for href in hrefs}), assets, exclude_assets
+        )
+
+        collections: Dict[str, Collection] = {}
+        item_hrefs = hrefs
+        if incremental:
+            existing: Dict[str, str] = {}
+            for product in sorted({product_from_h5(href) for href in hrefs}):
+                path = os.path.join(outdir, product, "collection.json")
+                if os.path.exists(path):
+                    collections[product] = Collection.from_file(path)
+                    existing.update(stac.linked_item_hrefs(collections[product]))
+            item_hrefs = stac.outdated_h5_hrefs(hrefs, existing, check_modified)
+            click.echo(
+                f"Creating Items for {len(item_hrefs)} of {len(hrefs)} H5 files",
+                err=True,
+            )
+
+        writer = None
+        if incremental or stream or item_format != "json":
+            writer = stac.CollectionWriter(outdir, collections, item_format=item_format)
 
         strategy = Strategy[antimeridian_strategy.upper()]
-        item_dict = defaultdict(list)
-        for href in hrefs:
-            h5dir = os.path.dirname(href)
-            root = os.path.splitext(href)[0]
-            product = os.path.basename(href).split(".")[0]
-            cog_hrefs = None
-            if create_cogs:
-                cog_hrefs = cog.cogify(href, h5dir)
-            else:
-                cog_hrefs = glob.glob(f"{root}*.tif")
-            item = stac.create_item(
-                href,
-                cog_hrefs=cog_hrefs,
+        with click.progressbar(length=len(item_hrefs), label="Creating Items") as bar:
+            result = stac.create_items(
+                item_hrefs,
+                create_cogs=create_cogs,
+                jobs=jobs,
+                block_rows=block_rows,
+                progress=lambda completed, total: bar.update(1),
                 antimeridian_strategy=strategy,
                 densification_factor=densification_factor,
                 simplification_tolerance=simplification_tolerance,
                 use_data_footprint=use_data_footprint,
+                metadata_cache=(
+                    MetadataCache(metadata_cache) if metadata_cache else None
+                ),
+                footprint_pixel_size=footprint_pixel_size,
+                item_callback=writer.add if writer else None,
+                cog_profile=profiles,
+                band_mode=band_mode.lower(),
+                assets=assets or None,
+                exclude_assets=exclude_assets,
+                skip_existing=skip_existing,
             )
-            item_dict[product].append(item)
 
-        for product, items in item_dict.items():
+        if writer:
+            writer.close()
+        for product, items in result.items.items():
             collection = stac.create_collection(product)
             collection.set_self_href(os.path.join(outdir, f"{product}/collection.json"))
             for item in items:
@@ -268,4 +746,87 @@ def create_viirs_command(cli: Group) -> Command:
             collection.validate_all()
             collection.save()
 
+        if result.failures:
+            for href, error in result.failures.items():
+                click.echo(f"{href}: {error}", err=True)
+            raise click.ClickException(
+                f"Failed to create Items for {len(result.failures)} of "
+                f"{len(item_hrefs)} H5 files"
+            )
+
+    @viirs.command(
+        "benchmark-cogs", short_help="Compare COG encoding profiles for an H5 file"
+    )
+    @click.argument("INFILE")
+    @click.option(
+        "-p",
+        "--cog-profile",
+        "cog_profiles",
+        multiple=True,
+        help="COG encoding profile to benchmark. Repeatable. Default is all profiles.",
+    )
+    @click.option(
+        "--cog-threads",
+        help="Number of threads GDAL uses to compress each COG, or ALL_CPUS",
+    )
+    def benchmark_cogs_command(
+        infile: str, cog_profiles: Tuple[str, ...], cog_threads: Optional[str]
+    ) -> None:
+        """Reports the encoding time and size of each subdataset COG of an H5
+        file for each COG encoding profile. Sizes are also given relative to
+        the first profile.
+
+        \b
+        Args:
+            infile (str): HREF to a VIIRS H5 file
+            cog_profiles (Tuple[str, ...]): Names of the COG encoding profiles
+                to compare. Default is all profiles.
+            cog_threads (str, optional): Number of threads GDAL uses to
+                compress each COG, an integer or 'ALL_CPUS'.
+        """
+        from stactools.viirs import cog
+
+        names = list(cog_profiles or cog.COG_PROFILES)
+        profiles = {name: _cog_profiles([name], cog_threads)["*"] for name in names}
+        results = cog.benchmark_profiles(infile, profiles)
+
+        click.echo(f"{'asset':<40} {'profile':<20} {'seconds':>8} {'bytes':>12} ratio")
+        sizes: Dict[str, int] = {}
+        for result in results:
+            size = sizes.setdefault(result.asset, result.size)
+            click.echo(
+                f"{result.asset:<40} {result.profile:<20} {result.seconds:>8.3f} "
+                f"{result.size:>12} {result.size / size:.3f}"
+            )
+        for name in names:
+            click.echo(
+                f"{'total':<40} {name:<20} "
+                f"{sum(r.seconds for r in results if r.profile == name):>8.3f} "
+                f"{sum(r.size for r in results if r.profile == name):>12}"
+            )
+
     return viirs
+
+
+def _check_assets(
+    products: Sequence[str], assets: Sequence[str], exclude_assets: Sequence[str]
+) -> None:
+    if not assets and not exclude_assets:
+        return
+    from stactools.viirs import cog
+
+    try:
+        cog.check_assets(products, [*assets, *exclude_assets])
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--asset/--exclude-asset")
+
+
+def _cog_profiles(
+    values: Sequence[str], num_threads: Optional[str]
+) -> Dict[str, "EncodingProfile"]:
+    from stactools.viirs import cog
+
+    try:
+        return cog.parse_profiles(values, num_threads)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--cog-profile/--cog-threads")
@@ -19,6 +19,16 @@ class VIIRSProducts(str, Enum):
 FOOTPRINT_DENSIFICATION_FACTOR = 10
 FOOTPRINT_SIMPLIFICATION_TOLERANCE = 0.0006  # degrees; approximately 60m
 FOOTPRINT_PRECISION = 7
+
+ITEM_FORMATS = ["json", "ndjson", "geoparquet"]
+ITEM_FILENAMES = {"ndjson": "items.ndjson", "geoparquet": "items.parquet"}
+
+# How 3-D subdatasets are written: one multi-band COG or one COG per band
+BAND_MODES = ["multiband", "split"]
+
+HEADER_BLOCK_SIZE = 2**16  # bytes per ranged read in header-only mode
+HEADER_MAX_BLOCKS = 32
+
 FOOTPRINT_DATA_ASSETS = {
     VIIRSProducts.VNP09A1.name: ["SurfReflect_M1"],
     VIIRSProducts.VNP09H1.name: ["SurfReflect_I1"],
@@ -72,7 +82,8 @@ MULTIPLE_NODATA = {
         },
         "500_m_16_days_pixel_reliability": {
             "multiple": [-1, -4],
-            "new": -32768
+            "new": -32768,
+            "new_int8": -128  # when written as native int8
         },
     },
     VIIRSProducts.VNP15A2H.name: {
@@ -0,0 +1,167 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import rasterio
+import shapely.geometry
+from affine import Affine
+from rasterio.crs import CRS
+from rasterio.enums import Resampling
+from stactools.core.utils import raster_footprint
+
+from stactools.viirs import constants
+from stactools.viirs.cog import DataMask
+from stactools.viirs.grid import SPHERE_RADIUS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DataFootprint:
+    """Footprint of the valid data area of a raster.
+
+    Attributes:
+        geometry (Dict[str, Any]): GeoJSON footprint in WGS84
+        bbox (List[float]): Bounding box of the footprint
+        decimation (int): Factor by which the raster was decimated before
+            extracting the footprint. A factor of 1 is full resolution, a factor
+            of 2**n corresponds to COG overview level n.
+        seconds (float): Time taken to read the data mask and extract the
+            footprint
+    """
+
+    geometry: Dict[str, Any]
+    bbox: List[float]
+    decimation: int
+    seconds: float
+
+
+def decimation_factor(
+    transform: Sequence[float],
+    crs: str,
+    shape: Sequence[int],
+    max_pixel_size: Optional[float] = None,
+) -> int:
+    """Chooses the decimation factor for a data footprint.
+
+    The factor is the largest power of two for which the decimated pixel size
+    does not exceed ``max_pixel_size``, matching the factors of the COG
+    overview levels. Pixel sizes in the sinusoidal projection are converted to
+    degrees at the equator.
+
+    Args:
+        transform (Sequence[float]): Georeferencing transformation matrix of
+            the full resolution raster
+        crs (str): Raster Coordinate Reference System
+        shape (Sequence[int]): Height and width of the full resolution raster
+        max_pixel_size (float, optional): Maximum decimated pixel size, in
+            degrees. The raster is not decimated if not given.
+
+    Returns:
+        int: The decimation factor
+    """
+    if max_pixel_size is None:
+        return 1
+    pixel_size = abs(transform[0])
+    if not CRS.from_user_input(crs).is_geographic:
+        pixel_size = math.degrees(pixel_size / SPHERE_RADIUS)
+    decimation = 1
+    while (
+        pixel_size * decimation * 2 <= max_pixel_size and min(shape) >= decimation * 2
+    ):
+        decimation *= 2
+    return decimation
+
+
+def data_footprint(
+    source: Union[DataMask, str],
+    crs: str,
+    densification_factor: int = constants.FOOTPRINT_DENSIFICATION_FACTOR,
+    simplification_tolerance: float = constants.FOOTPRINT_SIMPLIFICATION_TOLERANCE,
+    max_pixel_size: Optional[float] = None,
+) -> Optional[DataFootprint]:
+    """Extracts the footprint of the valid data area of a COG or data mask.
+
+    If ``max_pixel_size`` is given, the footprint is extracted from a
+    decimated mask (see :func:`decimation_factor`). COG masks are read from the
+    matching overview level. In-memory masks are reduced by blocks, a block
+    being valid if any of its pixels are valid, so small valid areas are not
+    dropped. Either way, the boundary of the footprint moves by up to about one
+    decimated pixel.
+
+    Args:
+        source (Union[DataMask, str]): A data mask recorded by
+            ``cog.cogify``, or the HREF of a COG
+        crs (str): Raster Coordinate Reference System
+        densification_factor (int): Factor by which to increase the number of
+            vertices on the footprint geometry in the raster CRS. Default is 10.
+        simplification_tolerance (float): Maximum acceptable geodetic distance,
+            in degrees, between the boundary of the simplified footprint
+            geometry and the original, densified geometry vertices after
+            reprojection. Default is 0.0006 degrees (~60m at the equator).
+        max_pixel_size (float, optional): Maximum pixel size, in degrees, of
+            the mask the footprint is extracted from. Full resolution is used
+            if not given.
+
+    Returns:
+        Optional[DataFootprint]: The footprint, or None if the raster holds no
+        valid data
+    """
+    start = time.perf_counter()
+    if isinstance(source, DataMask):
+        decimation = decimation_factor(
+            source.transform, crs, source.mask.shape, max_pixel_size
+        )
+        mask = _decimate(source.mask, decimation)
+        transform = Affine(*source.transform) * Affine.scale(
+            source.mask.shape[1] / mask.shape[1], source.mask.shape[0] / mask.shape[0]
+        )
+    else:
+        with rasterio.open(source) as src:
+            decimation = decimation_factor(
+                src.transform, crs, src.shape, max_pixel_size
+            )
+            out_shape = (-(-src.height // decimation), -(-src.width // decimation))
+            mask = src.read_masks(1, out_shape=out_shape, resampling=Resampling.nearest)
+            transform = src.transform * Affine.scale(
+                src.width / out_shape[1], src.height / out_shape[0]
+            )
+
+    footprint = raster_footprint.RasterFootprint(
+        mask[np.newaxis],
+        crs=CRS.from_user_input(crs),
+        transform=transform,
+        precision=constants.FOOTPRINT_PRECISION,
+        densification_factor=densification_factor,
+        simplify_tolerance=simplification_tolerance,
+        no_data=0,
+    ).footprint()
+    seconds = time.perf_counter() - start
+    if footprint is None:
+        return None
+    logger.info(
+        f"Extracted data footprint at decimation factor {decimation} "
+        f"in {seconds:.3f} s"
+    )
+    return DataFootprint(
+        geometry=footprint,
+        bbox=list(shapely.geometry.shape(footprint).bounds),
+        decimation=decimation,
+        seconds=seconds,
+    )
+
+
+def _decimate(mask: Any, decimation: int) -> Any:
+    """Reduces a mask by blocks of ``decimation`` pixels, a block being valid if
+    any of its pixels are valid."""
+    if decimation == 1:
+        return mask
+    height, width = mask.shape
+    rows = -(-height // decimation)
+    columns = -(-width // decimation)
+    padded = np.zeros((rows * decimation, columns * decimation), dtype=mask.dtype)
+    padded[:height, :width] = mask
+    return padded.reshape(rows, decimation, columns, decimation).max(axis=(1, 3))
@@ -1,12 +1,39 @@
 import json
-from typing import Any, Dict, List, Optional
+import re
+import sys
+from bisect import bisect_right
+from copy import deepcopy
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-import pkg_resources
 from pystac import Extent, Link, MediaType, Provider
 
+from stactools.viirs.constants import MULTIPLE_NODATA
+from stactools.viirs.utils import UnsupportedProduct, gdal_supports_int8
+
+if sys.version_info >= (3, 9):
+    from importlib.resources import files
+else:
+    from importlib_resources import files
+
+# Name of the COG of one band of a multi-band subdataset
+BAND_LAYER = re.compile(r"(?P<subdataset>.+)_band(?P<band>[1-9][0-9]*)(?P<fill>_fill)?")
+
 
 class STACFragments:
-    """Class for accessing collection and asset data."""
+    """Class for accessing collection and asset data.
+
+    Fragment files are parsed once per process and shared between instances.
+    Asset dictionaries are resolved once for each asset update epoch of a
+    product, so an instance selects its assets by production date without
+    reapplying updates. Dictionaries returned by the accessor methods are
+    copies and may be modified by the caller.
+
+    Asset fragments describe int8 subdatasets as native int8 COGs. If GDAL
+    cannot write those (see ``utils.gdal_supports_int8``), the returned Asset
+    dictionaries describe the int16 COGs written instead, unless the data type
+    of an existing COG is given.
+    """
 
     def __init__(self, product: str, production_year_doy: int = 2999000) -> None:
         # If a production date is not supplied, we would like to default to
@@ -15,9 +42,7 @@ class STACFragments:
         # updates are applied when a production_year_doy is not supplied.
         self.product = product
         self.item = self._load("item.json")
-        self.assets = self.item["assets"]
-        if "asset-updates" in self.item:
-            self._update_assets(production_year_doy)
+        self.assets = _asset_table(product, production_year_doy)
 
     def gsd(self) -> Optional[int]:
         """Returns the Item Ground Sample Distance (GSD).
@@ -35,25 +60,61 @@ class STACFragments:
         Returns:
             Dict[str, Any]: Dictionary of Asset dictionaries
         """
-        assets: Dict[str, Any] = self.assets
+        assets: Dict[str, Any] = deepcopy(self.assets)
         for key in assets.keys():
             assets[key]["type"] = MediaType.COG
+            self._match_cog_data_type(key, assets[key])
         return assets
 
-    def subdataset_dict(self, subdataset: str) -> Dict[str, Any]:
+    def subdataset_dict(
+        self, subdataset: str, data_type: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Returns an Asset dictionary (less the 'href' field) for the given
         product subdataset.
 
+        Multi-band subdatasets are described by a single Asset with an entry
+        per band in 'raster:bands' (and 'eo:bands'). The Asset of one band of a
+        subdataset written to its own COG, named with a '_band<n>' suffix (see
+        ``cog.cogify``), is derived from it by keeping the entries of that band.
+
         Args:
             subdataset (str): Subdataset name (from H5 file)
+            data_type (str, optional): Data type of the COG, e.g., as read from
+                an existing COG file. Defaults to the data type ``cog.cogify``
+                writes with the installed GDAL.
 
         Returns:
             Dict[str, Any]: Asset dictionary
         """
-        subdataset_asset: Dict[str, Any] = self.assets[subdataset]
+        key = subdataset
+        band = None
+        match = BAND_LAYER.fullmatch(subdataset)
+        if subdataset not in self.assets and match:
+            key = f"{match['subdataset']}{match['fill'] or ''}"
+            band = int(match["band"]) - 1
+        subdataset_asset: Dict[str, Any] = deepcopy(self.assets[key])
+        if band is not None:
+            _select_band(subdataset_asset, band)
         subdataset_asset["type"] = MediaType.COG
+        self._match_cog_data_type(key, subdataset_asset, data_type)
         return subdataset_asset
 
+    def has_int8_bands(self, subdataset: str) -> bool:
+        """Checks whether the Asset of a product subdataset describes int8
+        bands, which are written as int16 COGs when GDAL cannot write native
+        int8 COGs.
+
+        Args:
+            subdataset (str): Subdataset name (from H5 file)
+
+        Returns:
+            bool: True if any band of the Asset is int8
+        """
+        asset = self.subdataset_dict(subdataset, data_type="int8")
+        return any(
+            band.get("data_type") == "int8" for band in asset.get("raster:bands", [])
+        )
+
     def collection_dict(self) -> Dict[str, Any]:
         """Returns a dictionary of Collection fields (not exhaustive) for the
         VIIRS product used to create the class instance.
@@ -61,7 +122,7 @@ class STACFragments:
         Returns:
             Dict[str, Any]: Dictionary of Collection fields
         """
-        collection: Dict[str, Any] = self._load("collection.json")
+        collection: Dict[str, Any] = deepcopy(self._load("collection.json"))
         collection["extent"] = Extent.from_dict(collection["extent"])
         collection["providers"] = [
             Provider.from_dict(provider) for provider in collection["providers"]
@@ -75,25 +136,86 @@ class STACFragments:
         summary = []
         for asset in self.assets.values():
             if "eo:bands" in asset:
-                summary.extend(asset["eo:bands"])
+                summary.extend(deepcopy(asset["eo:bands"]))
         return summary
 
-    def _update_assets(self, production_year_doy: int) -> None:
-        def update_fields(source: Dict[str, Any], updates: Dict[str, Any]) -> None:
-            for band, fields in updates.items():
-                for field, value in fields.items():
-                    source[band][field] = value
-
-        asset_updates = self.item["asset-updates"]
-        for update_year_doy, bands in asset_updates.items():
-            if production_year_doy >= int(update_year_doy):
-                update_fields(self.assets, bands)
-
     def _load(self, file_name: str) -> Any:
-        try:
-            with pkg_resources.resource_stream(
-                "stactools.viirs.fragment", f"fragments/{self.product}/{file_name}"
-            ) as stream:
-                return json.load(stream)
-        except FileNotFoundError as e:
-            raise e
+        return _load_fragment(self.product, file_name)
+
+    def _match_cog_data_type(
+        self, subdataset: str, asset: Dict[str, Any], data_type: Optional[str] = None
+    ) -> None:
+        """Describes int8 bands as the int16 bands written by ``cog.cogify``
+        when the COG is int16 or, if its data type is not given, when GDAL
+        does not support native int8 COGs."""
+        if data_type is None:
+            data_type = "int8" if gdal_supports_int8() else "int16"
+        if data_type != "int16":
+            return
+        if subdataset.endswith("_fill"):
+            subdataset = subdataset[: -len("_fill")]
+        multiple = MULTIPLE_NODATA.get(self.product, {}).get(subdataset, {})
+        for band in asset.get("raster:bands", []):
+            if band.get("data_type") == "int8":
+                band["data_type"] = "int16"
+                if multiple and band.get("nodata") == multiple.get("new_int8"):
+                    band["nodata"] = multiple["new"]
+
+
+def _select_band(asset: Dict[str, Any], band: int) -> None:
+    """Reduces a multi-band Asset dictionary to one of its bands."""
+    for field in ("raster:bands", "eo:bands"):
+        if field in asset:
+            asset[field] = [asset[field][band]]
+    if "title" in asset:
+        asset["title"] = f"{asset['title']}, Band {band + 1}"
+
+
+def _asset_table(product: str, production_year_doy: int) -> Dict[str, Any]:
+    """Returns the asset dictionaries in effect for a production date.
+
+    The returned dictionary is shared and must not be modified.
+    """
+    update_dates, tables = _asset_epochs(product)
+    return tables[bisect_right(update_dates, production_year_doy)]
+
+
+@lru_cache(maxsize=None)
+def _asset_epochs(product: str) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """Resolves the asset dictionaries of a product for each asset update epoch.
+
+    Returns the sorted asset update dates and a list of asset dictionaries one
+    longer than the dates. The first dictionary is in effect before the first
+    update date and each following dictionary is in effect from the matching
+    update date onward.
+    """
+    item = _load_fragment(product, "item.json")
+    asset_updates = {
+        int(year_doy): bands
+        for year_doy, bands in item.get("asset-updates", {}).items()
+    }
+    update_dates = sorted(asset_updates)
+
+    assets: Dict[str, Any] = item["assets"]
+    tables = [assets]
+    for update_date in update_dates:
+        # updates replace whole fields, so shallow copies keep the shared
+        # fragment and earlier tables unmodified
+        assets = {key: dict(asset) for key, asset in assets.items()}
+        for band, fields in asset_updates[update_date].items():
+            assets[band].update(fields)
+        tables.append(assets)
+    return update_dates, tables
+
+
+@lru_cache(maxsize=None)
+def _load_fragment(product: str, file_name: str) -> Any:
+    """Parses a fragment file. The cached document is shared by all callers and
+    must not be modified."""
+    directory = files("stactools.viirs") / "fragments" / product
+    if not directory.is_dir():
+        raise UnsupportedProduct(
+            f"{product} is not supported by this stactools package"
+        )
+    with (directory / file_name).open("rb") as stream:
+        return json.load(stream)
@@ -0,0 +1,239 @@
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union, cast
+
+import h5py
+import numpy as np
+
+
+@dataclass
+class Subdataset:
+    """A GRIDS dataset within a VIIRS H5 file.
+
+    3-D datasets hold a stack of bands. The band axis is taken to be the
+    shortest axis, e.g., the last axis of a ``("YDim", "XDim",
+    "Num_Parameters")`` dataset.
+    """
+
+    key: str
+    name: str
+    shape: Tuple[int, ...]
+    dtype: np.dtype
+    nodata: Optional[Union[int, float]]
+    chunks: Optional[Tuple[int, ...]] = None
+    grid: Optional[str] = None
+
+    @property
+    def band_axis(self) -> Optional[int]:
+        """Axis of the bands of a 3-D subdataset, None otherwise."""
+        if len(self.shape) != 3:
+            return None
+        return int(np.argmin(self.shape))
+
+    @property
+    def band_count(self) -> int:
+        """Number of bands, 1 unless the subdataset is 3-D."""
+        if self.band_axis is None:
+            return 1
+        return self.shape[self.band_axis]
+
+    @property
+    def band_shape(self) -> Tuple[int, ...]:
+        """Number of rows and columns of each band."""
+        return tuple(n for i, n in enumerate(self.shape) if i != self.band_axis)
+
+
+class Granule:
+    """Read session on a VIIRS H5 file.
+
+    The file is opened once with h5py. The file tags and the subdataset fill
+    values are gathered in a single traversal of the HDF5 hierarchy, and
+    subdataset arrays are read through the same open file handle.
+
+    Tags are formatted to match those GDAL reports for a subdataset, i.e., the
+    root and group attributes keyed by their path with spaces and slashes
+    replaced by underscores.
+    """
+
+    def __init__(self, h5_href: str) -> None:
+        self.href = h5_href
+        self.h5 = h5py.File(h5_href, "r")
+        self.subdatasets: List[Subdataset] = []
+        self.tags = _scan(self.h5, self.subdatasets)
+
+    def __enter__(self) -> "Granule":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the H5 file."""
+        self.h5.close()
+
+    def read(self, subdataset: Subdataset) -> Any:
+        """Reads the full array of a subdataset.
+
+        Args:
+            subdataset (Subdataset): The subdataset to read
+
+        Returns:
+            Any: Numpy array of subdataset values
+        """
+        return self.h5[subdataset.key][()]
+
+    def read_band(self, subdataset: Subdataset, band: int) -> Any:
+        """Reads one band of a 3-D subdataset.
+
+        Args:
+            subdataset (Subdataset): The subdataset to read
+            band (int): Zero-based index of the band along the band axis
+
+        Returns:
+            Any: 2-D numpy array of band values
+        """
+        return self.h5[subdataset.key][_index(subdataset, band, slice(None))]
+
+    def read_blocks(
+        self, subdataset: Subdataset, block_rows: int, band: Optional[int] = None
+    ) -> Iterator[Tuple[int, Any]]:
+        """Reads a subdataset, or one band of a 3-D subdataset, in blocks of
+        rows.
+
+        The block height is rounded up to a multiple of the H5 chunk height so
+        that no chunk is decompressed more than once per band.
+
+        Args:
+            subdataset (Subdataset): The subdataset to read
+            block_rows (int): Number of rows per block
+            band (int, optional): Zero-based index of the band to read from a
+                3-D subdataset
+
+        Yields:
+            Tuple[int, Any]: The first row of the block and a 2-D numpy array
+            of the block values
+        """
+        row_axis = 1 if subdataset.band_axis == 0 else 0
+        if subdataset.chunks:
+            chunk_rows = subdataset.chunks[row_axis]
+            block_rows = -(-block_rows // chunk_rows) * chunk_rows
+        dataset = self.h5[subdataset.key]
+        for start in range(0, subdataset.shape[row_axis], block_rows):
+            stop = start + block_rows
+            yield start, dataset[_index(subdataset, band, slice(start, stop))]
+
+
+def gdal_tags(h5: h5py.File) -> Dict[str, str]:
+    """Reads the root and group attributes of an open H5 file as GDAL tags.
+
+    The tags match those GDAL reports for a subdataset of the file. Dataset
+    attributes are not read.
+
+    Args:
+        h5 (h5py.File): The open H5 file
+
+    Returns:
+        Dict[str, str]: The tags
+    """
+    return _scan(h5)
+
+
+def _scan(
+    h5: h5py.File, subdatasets: Optional[List[Subdataset]] = None
+) -> Dict[str, str]:
+    """Traverses an H5 file once, returning its GDAL tags and, if a list is
+    given, appending the GRIDS subdatasets to it."""
+    tags: Dict[str, str] = {}
+    _add_tags(tags, "", h5.attrs)
+
+    def visit(key: str, obj: Any) -> None:
+        if isinstance(obj, h5py.Group):
+            _add_tags(tags, _gdal_name(key), obj.attrs)
+        elif (
+            subdatasets is not None and isinstance(obj, h5py.Dataset) and "GRIDS" in key
+        ):
+            subdatasets.append(
+                Subdataset(
+                    key=key,
+                    name=_gdal_name(key).split("/")[-1],
+                    shape=obj.shape,
+                    dtype=obj.dtype,
+                    nodata=_fill_value(obj.attrs),
+                    chunks=obj.chunks,
+                    grid=_grid_name(key),
+                )
+            )
+
+    h5.visititems(visit)
+    return _sorted_tags(tags)
+
+
+def _index(
+    subdataset: Subdataset, band: Optional[int], rows: slice
+) -> Tuple[Union[int, slice], ...]:
+    """Returns the index of a block of rows of a subdataset or subdataset band."""
+    index: List[Union[int, slice]] = [slice(None)] * len(subdataset.shape)
+    if band is None:
+        index[0] = rows
+    else:
+        band_axis = cast(int, subdataset.band_axis)
+        index[band_axis] = band
+        index[1 if band_axis == 0 else 0] = rows
+    return tuple(index)
+
+
+def _sorted_tags(tags: Dict[str, str]) -> Dict[str, str]:
+    # GDAL returns metadata sorted by case-insensitive key
+    return {k: tags[k] for k in sorted(tags, key=str.upper)}
+
+
+def _gdal_name(key: str) -> str:
+    return key.replace(" ", "_")
+
+
+def _grid_name(key: str) -> Optional[str]:
+    parts = key.split("/")
+    if len(parts) > 2 and parts[1] == "GRIDS":
+        return parts[2]
+    return None
+
+
+def _add_tags(tags: Dict[str, str], prefix: str, attrs: Any) -> None:
+    for name, value in attrs.items():
+        tag = _gdal_name(name)
+        if prefix:
+            tag = f"{prefix.replace('/', '_')}_{tag}"
+        tags[tag] = _gdal_value(value)
+
+
+def _gdal_value(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    if isinstance(value, str):
+        return value
+    array = np.atleast_1d(np.asarray(value))
+    if array.size == 0:
+        return ""
+    if array.dtype.kind in ("S", "O", "U"):
+        # GDAL only reports the first element of a string array
+        return _gdal_value(array.flat[0])
+    if array.dtype == np.float32:
+        return " ".join(f"{v:.8g}" for v in array.flat)
+    if array.dtype.kind == "f":
+        return " ".join(f"{v:.15g}" for v in array.flat)
+    return " ".join(str(v) for v in array.flat)
+
+
+def _fill_value(attrs: Any) -> Optional[Union[int, float]]:
+    temp = None
+    if "_FillValue" in attrs.keys():
+        temp = attrs["_FillValue"].item()
+    elif "_Fillvalue" in attrs.keys():
+        temp = attrs["_Fillvalue"].item()
+    nodata: Optional[Union[int, float]] = None if temp == b"n/a" else temp
+    return nodata
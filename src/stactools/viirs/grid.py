@@ -0,0 +1,290 @@
+import copy
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+from stactools.viirs import constants
+from stactools.viirs.constants import VIIRSProducts
+
+SPHERE_RADIUS = 6371007.181  # meters; the sinusoidal grid spheroid
+
+# Number of pixels along each side of a tile
+TILE_SHAPES = {
+    VIIRSProducts.VNP09A1.name: 1200,
+    VIIRSProducts.VNP09H1.name: 2400,
+    VIIRSProducts.VNP10A1.name: 3000,
+    VIIRSProducts.VNP13A1.name: 2400,
+    VIIRSProducts.VNP14A1.name: 1200,
+    VIIRSProducts.VNP15A2H.name: 2400,
+    VIIRSProducts.VNP21A2.name: 1200,
+    VIIRSProducts.VNP43IA4.name: 2400,
+    VIIRSProducts.VNP43MA4.name: 1200,
+    VIIRSProducts.VNP46A2.name: 2400,
+}
+
+
+@dataclass(frozen=True)
+class TileGrid:
+    """A grid of 36 by 18 tiles covering the globe.
+
+    Attributes:
+        name (str): Grid name
+        crs (str): Grid Coordinate Reference System in EPSG or WKT2
+        tile_id_prefix (str): Prefix of the ``viirs:tile-id`` of each tile
+        left (float): Left edge of the grid in CRS units
+        top (float): Top edge of the grid in CRS units
+        tile_size (float): Width and height of a tile in CRS units
+    """
+
+    name: str
+    crs: str
+    tile_id_prefix: str
+    left: float
+    top: float
+    tile_size: float
+    columns: int = 36
+    rows: int = 18
+
+    def tile_id(self, horizontal_tile: int, vertical_tile: int) -> str:
+        """Returns the ``viirs:tile-id`` of a tile.
+
+        Args:
+            horizontal_tile (int): Horizontal tile number
+            vertical_tile (int): Vertical tile number
+
+        Returns:
+            str: The tile ID
+        """
+        return f"{self.tile_id_prefix}{horizontal_tile:03d}{vertical_tile:03d}"
+
+
+SINUSOIDAL_GRID = TileGrid(
+    name="sinusoidal",
+    crs=constants.SINUSOIDAL_WKT2,
+    tile_id_prefix="51",
+    left=-math.pi * SPHERE_RADIUS,
+    top=math.pi / 2 * SPHERE_RADIUS,
+    tile_size=2 * math.pi * SPHERE_RADIUS / 36,
+)
+GEOGRAPHIC_GRID = TileGrid(
+    name="geographic",
+    crs="EPSG:4326",
+    tile_id_prefix="61",
+    left=-180.0,
+    top=90.0,
+    tile_size=10.0,
+)
+
+
+@dataclass(frozen=True)
+class Tile:
+    """A tile of a VIIRS grid.
+
+    Attributes:
+        grid (TileGrid): The grid holding the tile
+        tile_id (str): Tile ID, as in the ``viirs:tile-id`` Item property
+        horizontal_tile (int): Horizontal tile number
+        vertical_tile (int): Vertical tile number
+        bbox (List[float]): Bounding box of the footprint in WGS84
+        geometry (Dict[str, Any]): GeoJSON footprint in WGS84. Sinusoidal
+            tiles are limited to the valid area of the projection, so a
+            footprint never crosses the antimeridian.
+    """
+
+    grid: TileGrid
+    tile_id: str
+    horizontal_tile: int
+    vertical_tile: int
+    bbox: List[float]
+    geometry: Dict[str, Any]
+
+    def transform(self, shape: int) -> List[float]:
+        """Georeferencing transformation matrix for the tile data.
+
+        Args:
+            shape (int): Number of pixels along each side of the tile, e.g.,
+                from ``TILE_SHAPES``
+
+        Returns:
+            List[float]: The transformation matrix
+        """
+        pixel_size = self.grid.tile_size / shape
+        left = self.grid.left + self.horizontal_tile * self.grid.tile_size
+        top = self.grid.top - self.vertical_tile * self.grid.tile_size
+        return [pixel_size, 0.0, left, 0.0, -pixel_size, top]
+
+
+class TileIndex:
+    """Footprints and bounding boxes of every tile of a grid.
+
+    The outlines of all tiles are densified and transformed to WGS84 in single
+    NumPy operations, and bounding box queries are evaluated against an array
+    of all tile bounding boxes. Tiles with no valid area, i.e., sinusoidal
+    tiles lying wholly off the globe, are not included.
+
+    Args:
+        grid (TileGrid): The grid to index
+        densification_factor (int): Number of segments each tile edge is
+            divided into before transformation to WGS84. Default is 10.
+    """
+
+    def __init__(
+        self,
+        grid: TileGrid,
+        densification_factor: int = constants.FOOTPRINT_DENSIFICATION_FACTOR,
+    ) -> None:
+        self.grid = grid
+        vertical, horizontal = np.divmod(
+            np.arange(grid.columns * grid.rows), grid.columns
+        )
+
+        # tile outlines, counterclockwise from the upper left corner
+        steps = np.arange(densification_factor) / densification_factor
+        zeros = np.zeros(densification_factor)
+        ones = np.ones(densification_factor)
+        u = np.concatenate([zeros, steps, ones, 1 - steps, [0.0]])
+        v = np.concatenate([steps, ones, 1 - steps, zeros, [0.0]])
+        x = grid.left + (horizontal[:, None] + u) * grid.tile_size
+        y = grid.top - (vertical[:, None] + v) * grid.tile_size
+        if grid is SINUSOIDAL_GRID:
+            lon, lat = _inverse_sinusoidal(x, y)
+        else:
+            lon, lat = x, y
+        lon = np.round(lon, constants.FOOTPRINT_PRECISION)
+        lat = np.round(lat, constants.FOOTPRINT_PRECISION)
+
+        # shoelace formula
+        area = 0.5 * np.abs(
+            np.sum(lon[:, :-1] * lat[:, 1:] - lon[:, 1:] * lat[:, :-1], axis=1)
+        )
+        valid = area > 0
+        lon, lat = lon[valid], lat[valid]
+
+        self.horizontal_tiles: Any = horizontal[valid]
+        self.vertical_tiles: Any = vertical[valid]
+        self.bboxes: Any = np.stack(
+            [lon.min(axis=1), lat.min(axis=1), lon.max(axis=1), lat.max(axis=1)],
+            axis=1,
+        )
+        self.tile_ids = [
+            grid.tile_id(h, v)
+            for h, v in zip(
+                self.horizontal_tiles.tolist(), self.vertical_tiles.tolist()
+            )
+        ]
+        self._indices = {tile_id: i for i, tile_id in enumerate(self.tile_ids)}
+        self._geometries = [
+            {"type": "Polygon", "coordinates": [_simplify(ring).tolist()]}
+            for ring in np.stack([lon, lat], axis=2)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.tile_ids)
+
+    def __iter__(self) -> Iterator[Tile]:
+        return (self._tile(i) for i in range(len(self)))
+
+    def tile(self, tile_id: str) -> Tile:
+        """Looks up a tile by ``viirs:tile-id``.
+
+        Args:
+            tile_id (str): The tile ID
+
+        Returns:
+            Tile: The tile
+        """
+        if tile_id not in self._indices:
+            raise KeyError(f"No {self.grid.name} grid tile with ID: {tile_id}")
+        return self._tile(self._indices[tile_id])
+
+    def intersecting(self, bbox: Sequence[float]) -> List[Tile]:
+        """Finds the tiles whose bounding box intersects a bounding box.
+
+        Args:
+            bbox (Sequence[float]): WGS84 bounding box as [west, south, east,
+                north]. A west value greater than the east value denotes a
+                bounding box crossing the antimeridian.
+
+        Returns:
+            List[Tile]: The intersecting tiles
+        """
+        west, south, east, north = bbox
+        if west > east:
+            lon_hits = (self.bboxes[:, 2] >= west) | (self.bboxes[:, 0] <= east)
+        else:
+            lon_hits = (self.bboxes[:, 0] <= east) & (self.bboxes[:, 2] >= west)
+        hits = lon_hits & (self.bboxes[:, 1] <= north) & (self.bboxes[:, 3] >= south)
+        return [self._tile(i) for i in np.flatnonzero(hits).tolist()]
+
+    def _tile(self, index: int) -> Tile:
+        return Tile(
+            grid=self.grid,
+            tile_id=self.tile_ids[index],
+            horizontal_tile=int(self.horizontal_tiles[index]),
+            vertical_tile=int(self.vertical_tiles[index]),
+            bbox=self.bboxes[index].tolist(),
+            geometry=copy.deepcopy(self._geometries[index]),
+        )
+
+
+def grid_for_product(product: str) -> TileGrid:
+    """Returns the grid of a VIIRS product.
+
+    Args:
+        product (str): VIIRS product, e.g., 'VNP13A1'
+
+    Returns:
+        TileGrid: The grid of the product
+    """
+    if constants.EPSG.get(product, None) == GEOGRAPHIC_GRID.crs:
+        return GEOGRAPHIC_GRID
+    return SINUSOIDAL_GRID
+
+
+@lru_cache(maxsize=None)
+def tile_index(product: str) -> TileIndex:
+    """Returns the index of the grid tiles of a VIIRS product.
+
+    Indices are created once per process and shared by all products on the
+    same grid.
+
+    Args:
+        product (str): VIIRS product, e.g., 'VNP13A1'
+
+    Returns:
+        TileIndex: The grid tile index
+    """
+    return _grid_index(grid_for_product(product))
+
+
+@lru_cache(maxsize=None)
+def _grid_index(grid: TileGrid) -> TileIndex:
+    return TileIndex(grid)
+
+
+def _inverse_sinusoidal(x: Any, y: Any) -> Any:
+    """Transforms sinusoidal coordinates to WGS84 longitudes and latitudes.
+
+    Longitudes of points off the globe are clipped to the antimeridian, which
+    limits a tile outline to the valid area of the projection.
+    """
+    lat = y / SPHERE_RADIUS
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lon = x / (SPHERE_RADIUS * np.cos(lat))
+    lon = np.nan_to_num(lon, nan=0.0, posinf=math.pi, neginf=-math.pi)
+    return np.clip(np.degrees(lon), -180.0, 180.0), np.degrees(lat)
+
+
+def _simplify(ring: Any) -> Any:
+    """Removes repeated vertices and vertices lying on a straight parallel or
+    meridian between their neighbors from a closed ring."""
+    points = ring[:-1]
+    points = points[np.any(points != np.roll(points, 1, axis=0), axis=1)]
+    previous = np.roll(points, 1, axis=0)
+    following = np.roll(points, -1, axis=0)
+    redundant = np.any((previous == points) & (points == following), axis=1)
+    points = points[~redundant]
+    return np.concatenate([points, points[:1]])
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+from threading import Lock
+from typing import Any, Dict, List
+
+import rasterio
+from rasterio.errors import RasterioIOError
+
+from stactools.viirs.cache import source_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Increment when the COGs written for the same H5 file and options change so
+# existing COGs are recreated
+MANIFEST_VERSION = 1
+MANIFEST_SUFFIX = ".cogs.json"
+
+# Creation options that do not change the COG contents, so are not compared
+RUNTIME_OPTIONS = {"num_threads"}
+
+
+class CogManifest:
+    """Record of the COGs created from a VIIRS H5 file.
+
+    The manifest is a JSON file alongside the COGs, named after the H5 file
+    with a '.cogs.json' suffix. It holds the H5 file fingerprint (see
+    :func:`cache.source_fingerprint`) and, for each COG, the creation options,
+    file size, SHA-256 hash, and raster shape and data types. ``cog.cogify``
+    includes the expected output data type and nodata value in the options,
+    so COGs are recreated when either changes. Options that only affect
+    encoding speed, such as ``num_threads``, are not recorded.
+
+    A COG is current while the H5 file is unchanged, the COG was created with
+    the same options, and a header-only read finds a COG of the recorded size,
+    shape and data types. COGs are not hashed again when checked; the hashes
+    are recorded so that outputs can be audited.
+
+    The manifest is saved each time COGs are recorded, which may be done from
+    multiple threads.
+
+    Args:
+        h5_href (str): HREF to the H5 file
+        outdir (str): The COG directory
+    """
+
+    def __init__(self, h5_href: str, outdir: str) -> None:
+        base_filename = os.path.splitext(os.path.basename(h5_href))[0]
+        self.path = os.path.join(outdir, f"{base_filename}{MANIFEST_SUFFIX}")
+        self.fingerprint = source_fingerprint(h5_href)
+        self.cogs: Dict[str, Dict[str, Any]] = {}
+        self._lock = Lock()
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path) as file:
+                manifest = json.load(file)
+        except ValueError:
+            logger.warning(f"Ignoring unreadable COG manifest {self.path}")
+            return
+        if (
+            manifest.get("version") == MANIFEST_VERSION
+            and manifest.get("fingerprint") == self.fingerprint
+        ):
+            self.cogs = manifest["cogs"]
+
+    def is_current(self, cog_path: str, options: Dict[str, Any]) -> bool:
+        """Checks whether a COG is up to date.
+
+        Args:
+            cog_path (str): Path to the COG
+            options (Dict[str, Any]): COG creation options, and any other
+                values the COG is expected to be written with
+
+        Returns:
+            bool: True if the COG was recorded with the same options and is a
+            valid COG of the recorded size, shape and data types
+        """
+        record = self.cogs.get(os.path.basename(cog_path))
+        # compared as JSON so that NaN nodata values are equal
+        if record is None or json.dumps(record["options"]) != json.dumps(
+            _output_options(options)
+        ):
+            return False
+        try:
+            if os.path.getsize(cog_path) != record["size"]:
+                return False
+            with rasterio.open(cog_path) as src:
+                return bool(
+                    src.tags(ns="IMAGE_STRUCTURE").get("LAYOUT") == "COG"
+                    and [src.count, src.height, src.width] == record["shape"]
+                    and list(src.dtypes) == record["dtypes"]
+                )
+        except (OSError, RasterioIOError):
+            return False
+
+    def record(self, cog_paths: List[str], options: Dict[str, Any]) -> None:
+        """Records newly created COGs and saves the manifest.
+
+        Args:
+            cog_paths (List[str]): Paths to the COGs
+            options (Dict[str, Any]): COG creation options, and any other
+                values the COG was written with
+        """
+        records = {os.path.basename(p): _cog_record(p, options) for p in cog_paths}
+        with self._lock:
+            self.cogs.update(records)
+            self._save()
+
+    def _save(self) -> None:
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": self.fingerprint,
+            "cogs": {name: self.cogs[name] for name in sorted(self.cogs)},
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def _cog_record(cog_path: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    sha256 = hashlib.sha256()
+    with open(cog_path, "rb") as file:
+        for chunk in iter(lambda: file.read(2**20), b""):
+            sha256.update(chunk)
+    with rasterio.open(cog_path) as src:
+        shape = [src.count, src.height, src.width]
+        dtypes = list(src.dtypes)
+    return {
+        "options": _output_options(options),
+        "size": os.path.getsize(cog_path),
+        "sha256": sha256.hexdigest(),
+        "shape": shape,
+        "dtypes": dtypes,
+    }
+
+
+def _output_options(options: Dict[str, Any]) -> Any:
+    output = {k: v for k, v in options.items() if k not in RUNTIME_OPTIONS}
+    return json.loads(json.dumps(output))
@@ -1,8 +1,10 @@
-import ast
+import copy
 import logging
-from dataclasses import dataclass
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import h5py
 import rasterio
@@ -14,9 +16,65 @@ from stactools.core.utils.raster_footprint import densify_reproject_simplify
 
 from stactools.viirs import constants, utils
 from stactools.viirs.constants import VIIRSProducts
+from stactools.viirs.granule import gdal_tags
+from stactools.viirs.ranged import HeaderOnly, RangedFile
+
+if TYPE_CHECKING:
+    from stactools.viirs.cache import MetadataCache
 
 logger = logging.getLogger(__name__)
 
+REQUIRED_TAGS = {
+    "starttime",
+    "endtime",
+    "productiontime",
+    "horizontaltilenumber",
+    "verticaltilenumber",
+    "tileid",
+}
+DATETIME_FIELDS = (
+    "acquisition_datetime",
+    "start_datetime",
+    "end_datetime",
+    "production_datetime",
+)
+GRID_FIELDS = ("XDim", "YDim", "UpperLeftPointMtrs", "LowerRightMtrs")
+
+
+@dataclass
+class Grid:
+    """Extent of an HDF-EOS grid defined in the H5 EOS metadata structure."""
+
+    name: str
+    shape: List[int]
+    left: float
+    right: float
+    top: float
+    bottom: float
+
+    @classmethod
+    def from_fields(cls, name: str, fields: Dict[str, str]) -> "Grid":
+        """Creates a grid from the fields of a GridStructure group.
+
+        Args:
+            name (str): The grid name
+            fields (Dict[str, str]): The grid fields, as returned by
+                :func:`parse_grid_structure`
+
+        Returns:
+            Grid: Grid dataclass
+        """
+        left, top = _parse_point(fields["UpperLeftPointMtrs"])
+        right, bottom = _parse_point(fields["LowerRightMtrs"])
+        return Grid(
+            name=name,
+            shape=[int(fields["YDim"]), int(fields["XDim"])],
+            left=left,
+            right=right,
+            top=top,
+            bottom=bottom,
+        )
+
 
 @dataclass
 class Metadata:
@@ -26,6 +84,9 @@ class Metadata:
     more consistent between products, there are several values that can only be
     obtained from the source H5 file, and the start dates in the VNP43 XML files
     are incorrect. Thus, only the H5 metadata is considered.
+
+    ``bytes_read`` is the number of bytes fetched from the H5 file when the
+    metadata is extracted in header-only mode, and None otherwise.
     """
 
     id: str
@@ -46,6 +107,8 @@ class Metadata:
     bottom: float
     xml_href: Optional[str]
     cloud_cover: Optional[int]
+    grids: Dict[str, Grid] = field(default_factory=dict)
+    bytes_read: Optional[int] = None
 
     @classmethod
     @utils.ignore_not_georeferenced()
@@ -54,6 +117,7 @@ class Metadata:
         h5_href: str,
         read_href_modifier: Optional[ReadHrefModifier] = None,
         xml_href: Optional[str] = None,
+        header_only: Optional[HeaderOnly] = None,
     ) -> "Metadata":
         """Extracts metadata from H5 attributes and H5 EOS metadata structure.
 
@@ -62,14 +126,37 @@ class Metadata:
             read_href_modifier (ReadHrefModifier, optional): An optional
                 function to modify the href (e.g. to add a token to a url)
             xml_href (str, optional): HREF to the XML metadata file
+            header_only (HeaderOnly, optional): If given, the H5 file is read
+                with ranged reads through a block cache so that only the blocks
+                holding the H5 header are fetched, e.g., from remote storage.
 
         Returns:
             Metadata: Metadata dataclass
         """
         read_h5_href = utils.modify_href(h5_href, read_href_modifier)
-        with rasterio.open(read_h5_href) as dataset:
-            tags = dataset.tags()
-            tags = {k.lower(): v for k, v in tags.items()}
+        # the GDAL tags and the EOS metadata structure, which GDAL does not
+        # access, are both read from a single h5py open
+        ranged: Optional[RangedFile] = None
+        with ExitStack() as stack:
+            if header_only:
+                ranged = stack.enter_context(
+                    RangedFile(
+                        read_h5_href, header_only.block_size, header_only.max_blocks
+                    )
+                )
+            h5 = stack.enter_context(h5py.File(ranged if ranged else read_h5_href, "r"))
+            tags = {k.lower(): v for k, v in gdal_tags(h5).items()}
+            metadata_str = h5["HDFEOS INFORMATION"]["StructMetadata.0"][()].decode(
+                "utf-8"
+            )
+        bytes_read: Optional[int] = None
+        if ranged is not None:
+            bytes_read = ranged.bytes_read
+            logger.info(f"Read {bytes_read} of {ranged.size} bytes from {h5_href}")
+        if not REQUIRED_TAGS.issubset(tags):
+            # fall back to GDAL, which also reports dataset attributes
+            with rasterio.open(read_h5_href) as dataset:
+                tags = {k.lower(): v for k, v in dataset.tags().items()}
 
         id = utils.id_from_h5(h5_href)
         product = utils.product_from_h5(h5_href)
@@ -97,23 +184,17 @@ class Metadata:
         else:
             cloud_cover = None
 
-        # rasterio does not access the EOS metadata structure
-        with h5py.File(read_h5_href, "r") as h5:
-            metadata_str = (
-                h5["HDFEOS INFORMATION"]["StructMetadata.0"][()].decode("utf-8").strip()
-            )
-            metadata_split_str = [m.strip() for m in metadata_str.split("\n")]
-            metadata_keys_values = [s.split("=") for s in metadata_split_str][:-1]
-            metadata_dict = {key: value for key, value in metadata_keys_values}
-
-        shape = [
-            int(metadata_dict["YDim"]),
-            int(metadata_dict["XDim"]),
-        ]
-        assert shape[0] == shape[1]
+        grids = {
+            name: Grid.from_fields(name, fields)
+            for name, fields in parse_grid_structure(metadata_str).items()
+        }
+        if not grids:
+            raise ValueError(f"No grid defined in EOS metadata structure of {h5_href}")
 
-        left, top = ast.literal_eval(metadata_dict["UpperLeftPointMtrs"])
-        right, bottom = ast.literal_eval(metadata_dict["LowerRightMtrs"])
+        # the last grid defines the extent reported for the Item
+        grid = list(grids.values())[-1]
+        shape = grid.shape
+        assert shape[0] == shape[1]
 
         return Metadata(
             id=id,
@@ -128,14 +209,47 @@ class Metadata:
             vertical_tile=vertical_tile,
             tile_id=tile_id,
             shape=shape,
-            left=left,
-            right=right,
-            top=top,
-            bottom=bottom,
+            left=grid.left,
+            right=grid.right,
+            top=grid.top,
+            bottom=grid.bottom,
             xml_href=xml_href,
             cloud_cover=cloud_cover,
+            grids=grids,
+            bytes_read=bytes_read,
         )
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializes the metadata to a JSON-compatible dictionary.
+
+        Returns:
+            Dict[str, Any]: The metadata, with datetimes in ISO 8601 format
+        """
+        metadata_dict = asdict(self)
+        for key in DATETIME_FIELDS:
+            if metadata_dict[key] is not None:
+                metadata_dict[key] = metadata_dict[key].isoformat()
+        return metadata_dict
+
+    @classmethod
+    def from_dict(cls, metadata_dict: Dict[str, Any]) -> "Metadata":
+        """Creates metadata from a dictionary created by :meth:`to_dict`.
+
+        Args:
+            metadata_dict (Dict[str, Any]): The serialized metadata
+
+        Returns:
+            Metadata: Metadata dataclass
+        """
+        metadata_dict = dict(metadata_dict)
+        for key in DATETIME_FIELDS:
+            if metadata_dict[key] is not None:
+                metadata_dict[key] = datetime.fromisoformat(metadata_dict[key])
+        metadata_dict["grids"] = {
+            name: Grid(**grid) for name, grid in metadata_dict["grids"].items()
+        }
+        return Metadata(**metadata_dict)
+
     def geometry(
         self, densification_factor: int, simplification_tolerance: float
     ) -> Dict[str, Any]:
@@ -154,34 +268,42 @@ class Metadata:
         Returns:
             Dict[str, Any]: GeoJSON geometry with additional vertices.
         """
-        num_rows, num_cols = self.shape
-        upper_left = (0, 0)
-        lower_left = (0, num_rows)
-        lower_right = (num_cols, num_rows)
-        upper_right = (num_cols, 0)
-        pixel_points = [upper_left, lower_left, lower_right, upper_right, upper_left]
-
-        affine = rasterio.Affine(*self.transform)
-        proj_points = [affine * xy for xy in pixel_points]
-        proj_polygon = shapely.geometry.polygon.Polygon(proj_points)
-
-        wgs84_polygon: Dict[str, Any] = shapely.geometry.mapping(
-            densify_reproject_simplify(
-                proj_polygon,
+        # a tile's geometry is the same for all granules, so it is memoized
+        return copy.deepcopy(
+            _tile_geometry(
                 self.crs,
-                densification_factor=densification_factor,
-                precision=constants.FOOTPRINT_PRECISION,
-                simplify_tolerance=simplification_tolerance,
+                tuple(self.transform),
+                tuple(self.shape),
+                densification_factor,
+                simplification_tolerance,
             )
         )
 
-        return wgs84_polygon
-
     @property
     def transform(self) -> List[float]:
         """Georeferencing transformation matrix for the grid data."""
-        height_pixels = self.shape[0]
-        width_pixels = self.shape[1]
+        return self.grid_transform()
+
+    def grid_transform(self, grid_name: Optional[str] = None) -> List[float]:
+        """Georeferencing transformation matrix for the data of a named grid.
+
+        Args:
+            grid_name (str, optional): Name of the HDF-EOS grid. Defaults to the
+                grid defining the Item extent, which is also used if the name
+                is not found.
+
+        Returns:
+            List[float]: The transformation matrix
+        """
+        grid = self.grids.get(grid_name) if grid_name else None
+        if grid is None:
+            height_pixels, width_pixels = self.shape
+            grid_left, grid_right = self.left, self.right
+            grid_top, grid_bottom = self.top, self.bottom
+        else:
+            height_pixels, width_pixels = grid.shape
+            grid_left, grid_right = grid.left, grid.right
+            grid_top, grid_bottom = grid.top, grid.bottom
         if self.epsg == 4326:
             # 10x10 degree geographic grid
             x_size = 10.0 / width_pixels
@@ -190,12 +312,12 @@ class Metadata:
             top = 90.0 - 10.0 * self.vertical_tile
         else:
             # Sinusoidal projection grid
-            width_meters = self.right - self.left
-            height_meters = self.top - self.bottom
+            width_meters = grid_right - grid_left
+            height_meters = grid_top - grid_bottom
             x_size = width_meters / width_pixels
             y_size = height_meters / height_pixels
-            left = self.left
-            top = self.top
+            left = grid_left
+            top = grid_top
         return [x_size, 0.0, left, 0.0, -y_size, top]
 
     @property
@@ -229,6 +351,8 @@ class Metadata:
 def viirs_metadata(
     h5_href: str,
     read_href_modifier: Optional[ReadHrefModifier] = None,
+    header_only: Optional[HeaderOnly] = None,
+    cache: Optional["MetadataCache"] = None,
 ) -> Metadata:
     """Checks input file validity and returns a metadata class.
 
@@ -236,6 +360,11 @@ def viirs_metadata(
         h5_href (str): HREF to the H5 data file
         read_href_modifier (ReadHrefModifier, optional): An optional function to
             modify the href (e.g. to add a token to a url)
+        header_only (HeaderOnly, optional): If given, only the blocks holding
+            the H5 header are fetched with ranged reads
+        cache (MetadataCache, optional): Persistent metadata cache. Cached
+            metadata is returned without reading the H5 file, and newly
+            extracted metadata is added to the cache.
 
     Returns:
         Metadata: Metadata dataclass
@@ -243,6 +372,11 @@ def viirs_metadata(
     product = utils.product_from_h5(h5_href)
     utils.check_if_supported(product)
 
+    if cache is not None:
+        metadata = cache.get(h5_href, read_href_modifier)
+        if metadata is not None:
+            return metadata
+
     xml_href: Optional[str] = f"{h5_href}.xml"
     read_xml_href = utils.modify_href(f"{h5_href}.xml", read_href_modifier)
     if not href_exists(read_xml_href):
@@ -250,4 +384,93 @@ def viirs_metadata(
         if product != VIIRSProducts.VNP46A2:
             logger.warning(f"Companion XML file is missing for: {h5_href}")
 
-    return Metadata.from_h5(h5_href, read_href_modifier, xml_href)
+    metadata = Metadata.from_h5(h5_href, read_href_modifier, xml_href, header_only)
+    if cache is not None:
+        cache.put(h5_href, metadata, read_href_modifier)
+    return metadata
+
+
+def parse_grid_structure(struct_metadata: str) -> Dict[str, Dict[str, str]]:
+    """Parses the grid definitions from an HDF-EOS StructMetadata ODL string.
+
+    Only the GridStructure group is parsed; parsing stops at its end. The
+    fields of each grid are kept separately, keyed by grid name, so files with
+    more than one grid are not conflated. Only the fields listed in
+    ``GRID_FIELDS`` are kept, and the nested Dimension, DataField, and
+    MergedFields groups of each grid are skipped.
+
+    Args:
+        struct_metadata (str): The StructMetadata.0 ODL string
+
+    Returns:
+        Dict[str, Dict[str, str]]: The unparsed field values of each grid,
+        keyed by grid name, in the order the grids are defined
+    """
+    start = struct_metadata.find("GROUP=GridStructure")
+    if start < 0:
+        return {}
+    grid_structure = struct_metadata[start:]
+    end = grid_structure.find("END_GROUP=GridStructure")
+    if end >= 0:
+        grid_structure = grid_structure[:end]
+
+    grids: Dict[str, Dict[str, str]] = {}
+    depth = 0
+    name = ""
+    fields: Dict[str, str] = {}
+    for line in grid_structure.splitlines()[1:]:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        if key == "GROUP" or key == "OBJECT":
+            depth += 1
+            if depth == 1:
+                name = value
+                fields = {}
+        elif key == "END_GROUP" or key == "END_OBJECT":
+            if depth == 1:
+                grids[name] = fields
+            depth -= 1
+        elif depth == 1:
+            if key == "GridName":
+                name = value.strip('"')
+            elif key in GRID_FIELDS:
+                fields[key] = value
+    return grids
+
+
+def _parse_point(value: str) -> Tuple[float, float]:
+    x, y = value.strip("()").split(",")
+    return float(x), float(y)
+
+
+@lru_cache(maxsize=1024)
+def _tile_geometry(
+    crs: str,
+    transform: Tuple[float, ...],
+    shape: Tuple[int, ...],
+    densification_factor: int,
+    simplification_tolerance: float,
+) -> Dict[str, Any]:
+    num_rows, num_cols = shape
+    upper_left = (0, 0)
+    lower_left = (0, num_rows)
+    lower_right = (num_cols, num_rows)
+    upper_right = (num_cols, 0)
+    pixel_points = [upper_left, lower_left, lower_right, upper_right, upper_left]
+
+    affine = rasterio.Affine(*transform)
+    proj_points = [affine * xy for xy in pixel_points]
+    proj_polygon = shapely.geometry.polygon.Polygon(proj_points)
+
+    wgs84_polygon: Dict[str, Any] = shapely.geometry.mapping(
+        densify_reproject_simplify(
+            proj_polygon,
+            crs,
+            densification_factor=densification_factor,
+            precision=constants.FOOTPRINT_PRECISION,
+            simplify_tolerance=simplification_tolerance,
+        )
+    )
+
+    return wgs84_polygon
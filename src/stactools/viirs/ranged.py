@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+import fsspec
+from fsspec.spec import AbstractBufferedFile
+
+from stactools.viirs.constants import HEADER_BLOCK_SIZE, HEADER_MAX_BLOCKS
+
+
+@dataclass
+class HeaderOnly:
+    """Options for reading only the header of an H5 file with ranged reads.
+
+    Attributes:
+        block_size (int): Size in bytes of each ranged read. Default is 64 KiB.
+        max_blocks (int): Maximum number of blocks held in the block cache.
+            Default is 32.
+    """
+
+    block_size: int = HEADER_BLOCK_SIZE
+    max_blocks: int = HEADER_MAX_BLOCKS
+
+
+class RangedFile(AbstractBufferedFile):
+    """Read-only file that fetches byte ranges through an LRU block cache.
+
+    Any HREF supported by fsspec may be read. Only the blocks holding the
+    requested bytes are fetched, so opening the file with h5py and reading its
+    attributes and metadata structure transfers a small fraction of the file.
+    Reads go through fsspec's buffered file and "blockcache" cache, with each
+    block fetched by ``cat_file`` on the HREF's filesystem, so local files are
+    cached in the same way as remote ones.
+
+    Attributes:
+        size (int): File size in bytes
+        bytes_read (int): Number of bytes fetched from storage
+        requests (int): Number of ranged reads made
+    """
+
+    def __init__(
+        self,
+        href: str,
+        block_size: int = HEADER_BLOCK_SIZE,
+        max_blocks: int = HEADER_MAX_BLOCKS,
+    ) -> None:
+        self.href = href
+        self.bytes_read = 0
+        self.requests = 0
+        fs, path = fsspec.core.url_to_fs(href)
+        super().__init__(
+            fs,
+            path,
+            mode="rb",
+            block_size=block_size,
+            cache_type="blockcache",
+            cache_options={"maxblocks": max_blocks},
+            size=fs.size(path),
+        )
+
+    def _fetch_range(self, start: int, end: int) -> bytes:
+        data: bytes = self.fs.cat_file(self.path, start=start, end=end)
+        self.bytes_read += len(data)
+        self.requests += 1
+        return data
@@ -1,23 +1,62 @@
+import glob
+import json
 import logging
 import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from itertools import groupby
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Union,
+    cast,
+)
 
+import pystac
+import rasterio
 import shapely.geometry
-from pystac import Asset, Collection, Item, Summaries
+from pystac import (
+    Asset,
+    CatalogType,
+    Collection,
+    Extent,
+    Item,
+    SpatialExtent,
+    Summaries,
+    TemporalExtent,
+)
 from pystac.extensions.eo import EOExtension
 from pystac.extensions.item_assets import AssetDefinition, ItemAssetsExtension
 from pystac.extensions.projection import ProjectionExtension
 from pystac.extensions.scientific import ScientificExtension
 from pystac.utils import datetime_to_str, make_absolute_href
+from rasterio.errors import RasterioIOError
 from stactools.core.io import ReadHrefModifier
 from stactools.core.utils import antimeridian, raster_footprint
 from stactools.core.utils.antimeridian import Strategy
 
-from stactools.viirs import constants
+from stactools.viirs import cog, constants, footprint
+from stactools.viirs.cache import MetadataCache
+from stactools.viirs.cog import DataMask, ProfileSpec
 from stactools.viirs.fragment import STACFragments
-from stactools.viirs.metadata import viirs_metadata
-from stactools.viirs.utils import check_if_supported, find_extensions
+from stactools.viirs.metadata import Metadata, viirs_metadata
+from stactools.viirs.ranged import HeaderOnly
+from stactools.viirs.utils import (
+    check_if_supported,
+    find_extensions,
+    id_from_h5,
+    modify_href,
+    product_from_h5,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +69,19 @@ def create_item(
     densification_factor: int = constants.FOOTPRINT_DENSIFICATION_FACTOR,
     simplification_tolerance: float = constants.FOOTPRINT_SIMPLIFICATION_TOLERANCE,
     use_data_footprint: bool = False,
+    metadata: Optional[Metadata] = None,
+    header_only: Optional[HeaderOnly] = None,
+    metadata_cache: Optional[MetadataCache] = None,
+    data_masks: Optional[Dict[str, DataMask]] = None,
+    footprint_pixel_size: Optional[float] = None,
 ) -> Item:
     """Creates a STAC Item from VIIRS data.
 
     Args:
         h5_href (str): href to an H5 (HDF5) file
-        cog_hrefs (List[str], optional): Optional list of COG asset TIF hrefs
+        cog_hrefs (List[str], optional): Optional list of COG asset TIF hrefs.
+            The data type of COGs of int8 subdatasets, which older GDAL
+            releases write as int16, is read from the COG header.
         read_href_modifier (Callable[[str], str], optional): An optional
             function to modify the href (e.g. to add a token to a url)
         antimeridian_strategy (Strategy, optional): Either split on -180 or
@@ -51,11 +97,34 @@ def create_item(
             Default is 0.0006 degrees (~60m at the equator).
         use_data_footprint (bool): Flag to extract footprint geometry based on
             data existence rather than the raster outline.
+        metadata (Metadata, optional): Metadata previously extracted from the
+            H5 file, e.g., when creating COGs. Extracted from the H5 file if
+            not given.
+        header_only (HeaderOnly, optional): If given, metadata is extracted
+            by fetching only the blocks holding the H5 header with ranged
+            reads, so the pixel data of remote H5 files is not transferred.
+            The bytes read are logged and available as ``bytes_read`` on the
+            metadata.
+        metadata_cache (MetadataCache, optional): Persistent metadata cache
+            consulted before extracting metadata from the H5 file.
+        data_masks (Dict[str, DataMask], optional): Valid data masks recorded
+            by ``cog.cogify``. If a mask of a footprint asset is given, it is
+            used for the data footprint instead of reading the COG.
+        footprint_pixel_size (float, optional): Maximum pixel size, in
+            degrees, of the data mask the data footprint is extracted from. If
+            given, the footprint is extracted from the coarsest COG overview
+            level, or block-reduced data mask, within this size. The footprint
+            boundary then moves by up to about one decimated pixel, so
+            decimation is opt-in: if not given, the footprint is traced at full
+            resolution and existing Item geometries are unchanged.
 
     Returns:
         pystac.Item: A STAC Item representing the VIIRS data.
     """
-    metadata = viirs_metadata(h5_href, read_href_modifier)
+    if metadata is None:
+        metadata = viirs_metadata(
+            h5_href, read_href_modifier, header_only, metadata_cache
+        )
     fragments = STACFragments(metadata.product, metadata.production_julian_date)
     geometry = metadata.geometry(densification_factor, simplification_tolerance)
 
@@ -94,7 +163,10 @@ def create_item(
         for href in cog_hrefs:
             basename = os.path.splitext(os.path.basename(href))[0]
             subdataset_name = basename.split("_", 1)[1]
-            asset_dict = fragments.subdataset_dict(subdataset_name)
+            data_type = None
+            if fragments.has_int8_bands(subdataset_name):
+                data_type = _cog_data_type(href, read_href_modifier)
+            asset_dict = fragments.subdataset_dict(subdataset_name, data_type)
             asset_dict["href"] = make_absolute_href(href)
             item.add_asset(subdataset_name, Asset.from_dict(asset_dict))
 
@@ -118,26 +190,82 @@ def create_item(
     antimeridian.fix_item(item, antimeridian_strategy)
 
     if use_data_footprint:
-        if not cog_hrefs:
+        footprint_assets = constants.FOOTPRINT_DATA_ASSETS[metadata.product]
+        masks = data_masks or {}
+        data_mask = next((masks[a] for a in footprint_assets if a in masks), None)
+        if data_mask is None and not cog_hrefs:
             logger.warning(
                 "Cannot update Item geometry from valid raster data without "
                 "COG hrefs. The raster outline was used instead."
             )
-        elif not raster_footprint.update_geometry_from_asset_footprint(
-            item,
-            asset_names=constants.FOOTPRINT_DATA_ASSETS[metadata.product],
-            precision=constants.FOOTPRINT_PRECISION,
-            densification_factor=densification_factor,
-            simplify_tolerance=simplification_tolerance,
-        ):
-            logger.warning(
-                "Request to update Item geometry from valid raster data "
-                "failed. The raster outline was used instead."
-            )
+        else:
+            if data_mask is not None or footprint_pixel_size is not None:
+                updated = _update_geometry_from_data_footprint(
+                    item,
+                    data_mask or _footprint_asset_href(item, footprint_assets),
+                    metadata.crs,
+                    densification_factor,
+                    simplification_tolerance,
+                    footprint_pixel_size,
+                )
+            else:
+                updated = raster_footprint.update_geometry_from_asset_footprint(
+                    item,
+                    asset_names=footprint_assets,
+                    precision=constants.FOOTPRINT_PRECISION,
+                    densification_factor=densification_factor,
+                    simplify_tolerance=simplification_tolerance,
+                )
+            if not updated:
+                logger.warning(
+                    "Request to update Item geometry from valid raster data "
+                    "failed. The raster outline was used instead."
+                )
 
     return item
 
 
+def _update_geometry_from_data_footprint(
+    item: Item,
+    source: Optional[Union[DataMask, str]],
+    crs: str,
+    densification_factor: int,
+    simplification_tolerance: float,
+    footprint_pixel_size: Optional[float],
+) -> bool:
+    if source is None:
+        return False
+    data_footprint = footprint.data_footprint(
+        source,
+        crs,
+        densification_factor,
+        simplification_tolerance,
+        footprint_pixel_size,
+    )
+    if data_footprint is None:
+        return False
+    item.geometry = data_footprint.geometry
+    item.bbox = data_footprint.bbox
+    return True
+
+
+def _cog_data_type(
+    href: str, read_href_modifier: Optional[ReadHrefModifier]
+) -> Optional[str]:
+    try:
+        with rasterio.open(modify_href(href, read_href_modifier)) as src:
+            return str(src.dtypes[0])
+    except RasterioIOError:
+        logger.warning(f"Cannot read the data type of {href}")
+        return None
+
+
+def _footprint_asset_href(item: Item, footprint_assets: List[str]) -> Optional[str]:
+    return next(
+        (item.assets[a].href for a in footprint_assets if a in item.assets), None
+    )
+
+
 def create_collection(product: str) -> Collection:
     """Creates a STAC Collection for a VIIRS product.
 
@@ -197,3 +325,535 @@ def create_collection(product: str) -> Collection:
     collection.stac_extensions = sorted(list(set(collection.stac_extensions)))
 
     return collection
+
+
+def linked_item_hrefs(collection: Collection) -> Dict[str, str]:
+    """Maps the IDs of the Items linked from a Collection to their HREFs.
+
+    The Items are not read. Item IDs are taken from the Item file names, as
+    laid out by ``create-collection``.
+
+    Args:
+        collection (Collection): A STAC Collection, e.g., read from a
+            ``collection.json`` file
+
+    Returns:
+        Dict[str, str]: Absolute Item HREFs keyed by Item ID
+    """
+    hrefs: Dict[str, str] = {}
+    for link in collection.get_links(pystac.RelType.ITEM):
+        href = link.get_absolute_href()
+        if href is not None:
+            hrefs[os.path.splitext(os.path.basename(href))[0]] = href
+    return hrefs
+
+
+def outdated_h5_hrefs(
+    h5_hrefs: List[str], item_hrefs: Dict[str, str], check_modified: bool = False
+) -> List[str]:
+    """Selects the H5 files whose Items are missing or, optionally, stale.
+
+    Args:
+        h5_hrefs (List[str]): HREFs to local H5 (HDF5) files
+        item_hrefs (Dict[str, str]): Existing Item HREFs keyed by Item ID, e.g.,
+            from :func:`linked_item_hrefs`
+        check_modified (bool): Flag to also select H5 files modified after
+            their Item file was written. Default is False.
+
+    Returns:
+        List[str]: The H5 HREFs that need an Item created, in input order
+    """
+    outdated = []
+    for h5_href in h5_hrefs:
+        item_href = item_hrefs.get(id_from_h5(h5_href))
+        if item_href is None or (
+            check_modified
+            and (
+                not os.path.exists(item_href)
+                or os.path.getmtime(h5_href) > os.path.getmtime(item_href)
+            )
+        ):
+            outdated.append(h5_href)
+    return outdated
+
+
+def add_items(collection: Collection, items: List[Item]) -> None:
+    """Adds new or replacement Items to a Collection without reading its
+    existing Items.
+
+    The link to any existing Item with the same ID is replaced, and the
+    Collection extent is expanded to cover the added Items. The extent is not
+    reduced if a replacement Item covers less than the Item it replaces. If
+    the Collection has no Items yet, its extent is set from the added Items.
+
+    Args:
+        collection (Collection): The Collection, with its self HREF set
+        items (List[Item]): The Items to add
+    """
+    if not items:
+        return
+    existing = linked_item_hrefs(collection)
+    replaced: Set[str] = set()
+    for item in items:
+        collection.add_item(item)
+        href = existing.get(item.id)
+        if href is not None:
+            replaced.add(href)
+    _remove_item_links(collection, replaced)
+
+    extent = Extent.from_items(items)
+    if existing:
+        extent = _union_extent(collection.extent, extent)
+    collection.extent.spatial = extent.spatial
+    collection.extent.temporal = extent.temporal
+
+
+class CollectionWriter:
+    """Saves Items to per-product Collections as the Items are created.
+
+    With the default ``json`` Item format, each added Item is validated and
+    saved right away, and the Collection keeps only a link to the Item file,
+    so the Items need not be held in memory. With the ``ndjson`` format, Items
+    are instead appended to a ``<product>/items.ndjson`` file as they are added.
+    With the ``geoparquet`` format, Items are held until :meth:`close` writes
+    them to a ``<product>/items.parquet`` file (see :func:`write_geoparquet`).
+    Bulk Item files keep absolute Asset HREFs, and their Collections hold no
+    Item links.
+
+    Collection extents are accumulated from the added Items, and the
+    Collection files are saved by :meth:`close`.
+
+    Args:
+        outdir (str): Directory holding a ``<product>/collection.json``
+            Collection for each product
+        collections (Dict[str, Collection], optional): Existing Collections,
+            keyed by product, to add Items to. Links to existing Items with
+            the same ID as an added Item are replaced, and the existing extent
+            is expanded. New Collections are created for other products. Only
+            supported with the ``json`` Item format.
+        validate (bool): Flag to validate each Item and Collection before it is
+            saved. Default is True.
+        item_format (str): One of ``constants.ITEM_FORMATS``. Default is ``json``.
+    """
+
+    def __init__(
+        self,
+        outdir: str,
+        collections: Optional[Dict[str, Collection]] = None,
+        validate: bool = True,
+        item_format: str = "json",
+    ) -> None:
+        if item_format not in constants.ITEM_FORMATS:
+            raise ValueError(f"Unsupported Item format: {item_format}")
+        if collections and item_format != "json":
+            raise ValueError(
+                f"Existing Collections cannot be updated with {item_format} Items"
+            )
+        self.outdir = outdir
+        self.validate = validate
+        self.item_format = item_format
+        self.collections: Dict[str, Collection] = {}
+        self._item_hrefs: Dict[str, Dict[str, str]] = {}
+        self._extents: Dict[str, Extent] = {}
+        self._ndjson_files: Dict[str, TextIO] = {}
+        self._parquet_items: Dict[str, List[Item]] = defaultdict(list)
+        for product, collection in (collections or {}).items():
+            self._open(product, collection)
+
+    def add(self, item: Item) -> None:
+        """Validates and saves an Item and links it from its Collection.
+
+        Args:
+            item (Item): An Item created by :func:`create_item`
+        """
+        product = product_from_h5(item.id)
+        collection = self.collections.get(product) or self._open(
+            product, create_collection(product)
+        )
+        if self.item_format == "json":
+            link = collection.add_item(item)
+            href = self._item_hrefs[product].get(item.id)
+            if href is not None:
+                _remove_item_links(collection, {href})
+            item.make_asset_hrefs_relative()
+            if self.validate:
+                item.validate()
+            item.save_object(include_self_link=False)
+            link.target = self._item_hrefs[product][item.id] = cast(
+                str, item.get_self_href()
+            )
+        else:
+            item.collection_id = collection.id
+            if self.validate:
+                item.validate()
+            if self.item_format == "ndjson":
+                self._ndjson_files[product].write(_ndjson_line(item))
+            else:
+                self._parquet_items[product].append(item)
+
+        extent = Extent.from_items([item])
+        if product in self._extents:
+            extent = _union_extent(self._extents[product], extent)
+        self._extents[product] = extent
+
+    def close(self) -> Dict[str, Collection]:
+        """Writes any held Items, updates the extents of the Collections Items
+        were added to and saves them.
+
+        Returns:
+            Dict[str, Collection]: The saved Collections, keyed by product
+        """
+        for file in self._ndjson_files.values():
+            file.close()
+        for product, items in self._parquet_items.items():
+            write_geoparquet(items, self._item_path(product))
+        self._parquet_items.clear()
+
+        saved = {}
+        for product, extent in self._extents.items():
+            collection = self.collections[product]
+            collection.extent.spatial = extent.spatial
+            collection.extent.temporal = extent.temporal
+            if self.validate:
+                collection.validate()
+            collection.save_object(include_self_link=False)
+            saved[product] = collection
+        return saved
+
+    def _open(self, product: str, collection: Collection) -> Collection:
+        collection.set_self_href(os.path.join(self.outdir, product, "collection.json"))
+        collection.catalog_type = CatalogType.SELF_CONTAINED
+        self.collections[product] = collection
+        self._item_hrefs[product] = linked_item_hrefs(collection)
+        if self._item_hrefs[product]:
+            self._extents[product] = collection.extent
+        if self.item_format != "json":
+            os.makedirs(os.path.join(self.outdir, product), exist_ok=True)
+        if self.item_format == "ndjson":
+            self._ndjson_files[product] = open(self._item_path(product), "w")
+        return collection
+
+    def _item_path(self, product: str) -> str:
+        return os.path.join(
+            self.outdir, product, constants.ITEM_FILENAMES[self.item_format]
+        )
+
+
+def write_ndjson(items: Iterable[Item], path: str) -> int:
+    """Writes Items to a newline-delimited JSON file, one Item per line.
+
+    Items are written as they are iterated, so a generator of Items is never
+    held in memory. Asset HREFs are written as they are, so should be absolute.
+
+    Args:
+        items (Iterable[Item]): The Items
+        path (str): Path to the NDJSON file
+
+    Returns:
+        int: The number of Items written
+    """
+    count = 0
+    with open(path, "w") as file:
+        for item in items:
+            file.write(_ndjson_line(item))
+            count += 1
+    return count
+
+
+def write_geoparquet(items: Iterable[Item], path: str) -> int:
+    """Writes Items to a stac-geoparquet file.
+
+    Items are sorted by ``viirs:tile-id`` and datetime, and each tile is
+    written as a separate row group, so readers filtering on a tile only read
+    the row groups of that tile. The Items are held in memory while sorting.
+
+    Requires the optional ``stac-geoparquet`` and ``pyarrow`` dependencies,
+    installed with ``pip install stactools-viirs[geoparquet]``.
+
+    Args:
+        items (Iterable[Item]): The Items
+        path (str): Path to the Parquet file
+
+    Returns:
+        int: The number of Items written
+    """
+    try:
+        import pyarrow as pa
+        from stac_geoparquet.arrow import parse_stac_items_to_arrow, to_parquet
+    except ImportError as e:
+        raise ImportError(
+            "Writing stac-geoparquet requires the stac-geoparquet and pyarrow "
+            "packages. Install them with 'pip install stactools-viirs[geoparquet]'."
+        ) from e
+
+    dicts = sorted(
+        (
+            item.to_dict(include_self_link=False, transform_hrefs=False)
+            for item in items
+        ),
+        key=lambda d: (d["properties"].get("viirs:tile-id", ""), d["id"]),
+    )
+    if not dicts:
+        return 0
+    table = parse_stac_items_to_arrow(dicts).read_all().combine_chunks()
+
+    batches = []
+    start = 0
+    for _, group in groupby(d["properties"].get("viirs:tile-id", "") for d in dicts):
+        length = len(list(group))
+        batches.extend(table.slice(start, length).to_batches())
+        start += length
+    # each record batch is written as a row group
+    to_parquet(pa.RecordBatchReader.from_batches(table.schema, batches), path)
+    return len(dicts)
+
+
+def _ndjson_line(item: Item) -> str:
+    return (
+        json.dumps(item.to_dict(include_self_link=False, transform_hrefs=False)) + "\n"
+    )
+
+
+def _remove_item_links(collection: Collection, hrefs: Set[str]) -> None:
+    """Removes the unresolved links to the Items at the given HREFs."""
+    if hrefs:
+        collection.links = [
+            link
+            for link in collection.links
+            if link.rel != pystac.RelType.ITEM
+            or link.is_resolved()
+            or link.get_absolute_href() not in hrefs
+        ]
+
+
+def _union_extent(extent: Extent, other: Extent) -> Extent:
+    """Returns the extent covering the first spatial and temporal intervals of
+    two extents. A missing (open) interval end stays open."""
+    bbox = extent.spatial.bboxes[0]
+    other_bbox = other.spatial.bboxes[0]
+    start, end = extent.temporal.intervals[0]
+    other_start, other_end = other.temporal.intervals[0]
+    return Extent(
+        spatial=SpatialExtent(
+            [
+                [
+                    min(bbox[0], other_bbox[0]),
+                    min(bbox[1], other_bbox[1]),
+                    max(bbox[2], other_bbox[2]),
+                    max(bbox[3], other_bbox[3]),
+                ]
+            ]
+        ),
+        temporal=TemporalExtent(
+            [
+                [
+                    (
+                        None
+                        if start is None or other_start is None
+                        else min(start, other_start)
+                    ),
+                    None if end is None or other_end is None else max(end, other_end),
+                ]
+            ]
+        ),
+    )
+
+
+@dataclass
+class BatchResult:
+    """Items and failures from a batch of VIIRS H5 files.
+
+    Attributes:
+        items (Dict[str, List[Item]]): Items grouped by VIIRS product, in the
+            order of the input HREFs
+        failures (Dict[str, str]): Error message for each H5 HREF that failed
+    """
+
+    items: Dict[str, List[Item]] = field(default_factory=dict)
+    failures: Dict[str, str] = field(default_factory=dict)
+
+
+def create_items(
+    h5_hrefs: List[str],
+    create_cogs: bool = False,
+    jobs: int = 1,
+    block_rows: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    antimeridian_strategy: Strategy = Strategy.SPLIT,
+    densification_factor: int = constants.FOOTPRINT_DENSIFICATION_FACTOR,
+    simplification_tolerance: float = constants.FOOTPRINT_SIMPLIFICATION_TOLERANCE,
+    use_data_footprint: bool = False,
+    metadata_cache: Optional[MetadataCache] = None,
+    footprint_pixel_size: Optional[float] = None,
+    item_callback: Optional[Callable[[Item], None]] = None,
+    cog_profile: Optional[ProfileSpec] = None,
+    band_mode: str = "multiband",
+    assets: Optional[Sequence[str]] = None,
+    exclude_assets: Optional[Sequence[str]] = None,
+    skip_existing: bool = False,
+) -> BatchResult:
+    """Creates STAC Items for a batch of VIIRS H5 files.
+
+    COGs are either created alongside each H5 file or, if not created, any
+    existing COGs alongside the H5 file are included as Assets. A failure for
+    one H5 file is recorded and does not stop the remainder of the batch.
+
+    Args:
+        h5_hrefs (List[str]): HREFs to H5 (HDF5) files
+        create_cogs (bool): Flag to create COGs for each H5 file. If False,
+            COGs are assumed to exist alongside the H5 files.
+        jobs (int): Number of processes used to create Items. H5 files are
+            processed in the calling process if 1. Default is 1.
+        block_rows (int, optional): If given, subdatasets are streamed to COGs
+            in blocks of this many rows rather than read in full.
+        progress (Callable[[int, int], None], optional): Function called with
+            the number of completed and total H5 files as each H5 file finishes
+        antimeridian_strategy (Strategy, optional): Either split on -180 or
+            normalize geometries so all longitudes are either positive or
+            negative. Default is to split antimeridian geometries.
+        densification_factor (int): Factor by which to increase the number of
+            vertices on the extracted footprint geometry. Default is 10.
+        simplification_tolerance (float): Maximum acceptable geodetic distance,
+            in degrees, for footprint geometry simplification. Default is
+            0.0006 degrees (~60m at the equator).
+        use_data_footprint (bool): Flag to extract footprint geometry based on
+            data existence rather than the raster outline.
+        metadata_cache (MetadataCache, optional): Persistent metadata cache
+            consulted before extracting metadata from each H5 file.
+        footprint_pixel_size (float, optional): Maximum pixel size, in
+            degrees, of the data mask data footprints are extracted from. Full
+            resolution is used if not given.
+        item_callback (Callable[[Item], None], optional): Function called, in
+            the calling process, with each Item as soon as it is created, e.g.,
+            ``CollectionWriter.add``. Items are then not kept in the result,
+            and an error raised by the function is recorded as a failure of
+            the H5 file.
+        cog_profile (ProfileSpec, optional): COG encoding profile, profile
+            name, or dictionary of either keyed by product (see
+            ``cog.encoding_profile``). Default is 'deflate'.
+        band_mode (str): Choice of 'multiband' or 'split' to write 3-D
+            subdatasets to multi-band COGs or to a COG per band. Default is
+            'multiband'.
+        assets (Sequence[str], optional): Asset keys of the subdatasets to
+            convert when creating COGs. Keys of other products in the batch
+            are ignored for each H5 file. All subdatasets are converted if not
+            given.
+        exclude_assets (Sequence[str], optional): Asset keys of subdatasets
+            not to convert when creating COGs.
+        skip_existing (bool): Flag to keep a manifest of the COGs created for
+            each H5 file and skip COGs that are up to date (see
+            ``cog.cogify``), so a re-run of a batch only creates the missing
+            COGs. Default is False.
+
+    Returns:
+        BatchResult: Items grouped by product and any per-file failures
+
+    Raises:
+        ValueError: If ``assets`` or ``exclude_assets`` hold a key that is not
+            a subdataset asset key of any product in the batch
+    """
+    if assets is not None or exclude_assets:
+        cog.check_assets(
+            sorted({product_from_h5(href) for href in h5_hrefs}),
+            [*(assets or []), *(exclude_assets or [])],
+        )
+    item_kwargs: Dict[str, Any] = dict(
+        antimeridian_strategy=antimeridian_strategy,
+        densification_factor=densification_factor,
+        simplification_tolerance=simplification_tolerance,
+        use_data_footprint=use_data_footprint,
+        footprint_pixel_size=footprint_pixel_size,
+    )
+    cog_kwargs: Dict[str, Any] = dict(
+        block_rows=block_rows,
+        profile=cog_profile,
+        band_mode=band_mode,
+        assets=assets,
+        exclude_assets=exclude_assets,
+        skip_existing=skip_existing,
+    )
+    total = len(h5_hrefs)
+    items: Dict[int, Item] = {}
+    failures: Dict[int, str] = {}
+
+    completed = 0
+
+    def record(index: int, get_item: Callable[[], Item]) -> None:
+        nonlocal completed
+        try:
+            item = get_item()
+            if item_callback:
+                item_callback(item)
+            else:
+                items[index] = item
+        except Exception as e:
+            logger.warning(f"Failed to create Item for {h5_hrefs[index]}: {e}")
+            failures[index] = f"{type(e).__name__}: {e}"
+        completed += 1
+        if progress:
+            progress(completed, total)
+
+    if jobs == 1:
+        for index, href in enumerate(h5_hrefs):
+            record(
+                index,
+                lambda: _create_batch_item(
+                    href, create_cogs, cog_kwargs, metadata_cache, item_kwargs
+                ),
+            )
+    else:
+        with ProcessPoolExecutor(jobs) as executor:
+            futures = {
+                executor.submit(
+                    _create_batch_item,
+                    href,
+                    create_cogs,
+                    cog_kwargs,
+                    metadata_cache,
+                    item_kwargs,
+                ): i
+                for i, href in enumerate(h5_hrefs)
+            }
+            for future in as_completed(futures):
+                record(futures[future], future.result)
+
+    item_dict: Dict[str, List[Item]] = defaultdict(list)
+    for index in sorted(items):
+        item_dict[product_from_h5(h5_hrefs[index])].append(items[index])
+    return BatchResult(
+        items=dict(item_dict),
+        failures={h5_hrefs[i]: failures[i] for i in sorted(failures)},
+    )
+
+
+def _create_batch_item(
+    h5_href: str,
+    create_cogs: bool,
+    cog_kwargs: Dict[str, Any],
+    metadata_cache: Optional[MetadataCache],
+    item_kwargs: Dict[str, Any],
+) -> Item:
+    metadata = viirs_metadata(h5_href, cache=metadata_cache)
+    data_masks: Dict[str, DataMask] = {}
+    if create_cogs:
+        product_assets = cog.subdataset_assets(metadata.product)
+        for key in ("assets", "exclude_assets"):
+            if cog_kwargs[key] is not None:
+                cog_kwargs = dict(cog_kwargs)
+                cog_kwargs[key] = [a for a in cog_kwargs[key] if a in product_assets]
+        cog_hrefs = cog.cogify(
+            h5_href,
+            os.path.dirname(h5_href),
+            metadata=metadata,
+            data_masks=data_masks if item_kwargs["use_data_footprint"] else None,
+            **cog_kwargs,
+        )
+    else:
+        cog_hrefs = glob.glob(f"{os.path.splitext(h5_href)[0]}*.tif")
+    return create_item(
+        h5_href,
+        cog_hrefs=cog_hrefs,
+        metadata=metadata,
+        data_masks=data_masks,
+        **item_kwargs,
+    )
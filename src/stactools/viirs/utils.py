@@ -2,10 +2,13 @@ import os
 import warnings
 from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from typing import Any, Dict, Generator, List, Optional
 
 from pystac.extensions.eo import EOExtension
 from pystac.extensions.raster import RasterExtension
+from rasterio.dtypes import dtype_rev
+from rasterio.env import GDALVersion
 from rasterio.errors import NotGeoreferencedWarning
 from stactools.core.io import ReadHrefModifier
 
@@ -26,6 +29,20 @@ def ignore_not_georeferenced() -> Generator[None, None, None]:
         yield
 
 
+@lru_cache(maxsize=None)
+def gdal_supports_int8() -> bool:
+    """Checks for native signed byte (Int8) raster support, which requires GDAL
+    3.7 or later and a rasterio release that maps int8 to it. Older releases
+    write int8 data as unsigned bytes.
+
+    Returns:
+        bool: True if int8 COGs can be written natively
+    """
+    if not GDALVersion.runtime().at_least("3.7"):
+        return False
+    return bool(dtype_rev.get("int8") != dtype_rev.get("uint8"))
+
+
 def modify_href(
     href: str, read_href_modifier: Optional[ReadHrefModifier] = None
 ) -> str:
@@ -1,7 +1,10 @@
+from datetime import datetime, timezone
 from typing import Any, Dict
 
 from stactools.testing.test_data import TestData
 
+from stactools.viirs.metadata import Grid, Metadata
+
 VNP_HAS_XML_FILE_NAMES = [
     "VNP09A1.A2012017.h00v09.001.2016294114238.h5",
     "VNP09A1.A2022145.h11v05.001.2022154194417.h5",
@@ -15,6 +18,8 @@ VNP_HAS_XML_FILE_NAMES = [
     "VNP43MA4.A2022140.h11v05.001.2022148093246.h5",
 ]
 
+EXAMPLE_FILE_NAME = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+
 VNP_H5_ONLY_FILE_NAMES = [
     "VNP46A2.A2022097.h11v05.001.2022105104455.h5",
 ]
@@ -44,3 +49,37 @@ def create_external_data_dict() -> Dict[str, Dict[str, Any]]:
 external_data = create_external_data_dict()
 
 test_data = TestData(__file__, external_data=external_data)
+
+
+def example_metadata(h5_href: str) -> Metadata:
+    return Metadata(
+        id=EXAMPLE_FILE_NAME[:-3],
+        product="VNP13A1",
+        version="001",
+        acquisition_datetime=None,
+        start_datetime=datetime(2022, 4, 7, tzinfo=timezone.utc),
+        end_datetime=datetime(2022, 4, 22, 23, 59, 59, tzinfo=timezone.utc),
+        production_datetime=datetime(2022, 4, 23, 8, 9),
+        production_julian_date=2022113,
+        horizontal_tile=11,
+        vertical_tile=5,
+        tile_id="51011005",
+        shape=[2400, 2400],
+        left=-7783653.637667,
+        right=-6671703.118,
+        top=4447802.078667,
+        bottom=3335851.559,
+        xml_href=f"{h5_href}.xml",
+        cloud_cover=None,
+        grids={
+            "VIIRS_Grid_16Day_VI_500m": Grid(
+                "VIIRS_Grid_16Day_VI_500m",
+                [2400, 2400],
+                -7783653.637667,
+                -6671703.118,
+                4447802.078667,
+                3335851.559,
+            )
+        },
+        bytes_read=1024,
+    )
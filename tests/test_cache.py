@@ -0,0 +1,45 @@
+import os
+from dataclasses import replace
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from stactools.viirs.cache import MetadataCache
+from stactools.viirs.metadata import viirs_metadata
+from tests import EXAMPLE_FILE_NAME, example_metadata
+
+
+def test_metadata_cache() -> None:
+    with TemporaryDirectory() as tmp_dir:
+        h5_href = os.path.join(tmp_dir, EXAMPLE_FILE_NAME)
+        with open(h5_href, "wb") as file:
+            file.write(b"h5")
+        cache = MetadataCache(os.path.join(tmp_dir, "cache.db"))
+        assert cache.get(h5_href) is None
+
+        cache.put(h5_href, example_metadata(h5_href))
+        cached = cache.get(h5_href)
+        assert cached == replace(example_metadata(h5_href), bytes_read=None)
+
+        with mock.patch("stactools.viirs.metadata.Metadata.from_h5") as from_h5:
+            assert viirs_metadata(h5_href, cache=cache) == cached
+        from_h5.assert_not_called()
+
+        with open(h5_href, "wb") as file:
+            file.write(b"changed")
+        assert cache.get(h5_href) is None
+
+
+def test_metadata_cache_moved_file() -> None:
+    with TemporaryDirectory() as tmp_dir:
+        h5_href = os.path.join(tmp_dir, EXAMPLE_FILE_NAME)
+        with open(h5_href, "wb") as file:
+            file.write(b"h5")
+        cache = MetadataCache(os.path.join(tmp_dir, "cache.db"))
+        cache.put(h5_href, example_metadata(h5_href))
+
+        os.mkdir(os.path.join(tmp_dir, "moved"))
+        moved_href = os.path.join(tmp_dir, "moved", EXAMPLE_FILE_NAME)
+        os.rename(h5_href, moved_href)
+        cached = cache.get(moved_href)
+        assert cached is not None
+        assert cached.xml_href == f"{moved_href}.xml"
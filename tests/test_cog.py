@@ -1,10 +1,19 @@
 import os.path
 from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Tuple, cast
+from unittest import mock
 
+import h5py
+import numpy as np
+import pytest
 import rasterio
 
 import stactools.viirs.cog
+from stactools.viirs.constants import MULTIPLE_NODATA
+from stactools.viirs.fragment import STACFragments
+from stactools.viirs.granule import Granule
 from stactools.viirs.stac import create_item
+from stactools.viirs.utils import gdal_supports_int8
 from tests import test_data
 
 SUBDATASET_NAMES = [
@@ -14,6 +23,12 @@ SUBDATASET_NAMES = [
     "sample",
 ]
 
+MULTIPLE_NODATA_SUBDATASETS = [
+    (product, subdataset)
+    for product, subdatasets in MULTIPLE_NODATA.items()
+    for subdataset in subdatasets
+]
+
 COG_LIST = [
     f"VNP14A1.A2019054.h11v05.001.2019055201945_{subdataset_name}.tif"
     for subdataset_name in SUBDATASET_NAMES
@@ -56,11 +71,51 @@ def test_create_cogs() -> None:
     assert set(file_names) == set(expected_cog_names)
 
 
+def test_create_cogs_assets() -> None:
+    filename = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+    href = test_data.get_external_data(filename)
+    _ = test_data.get_external_data(f"{filename}.xml")
+    assets = ["500_m_16_days_NDVI", "500_m_16_days_VI_Quality"]
+    with TemporaryDirectory() as tmp_dir, mock.patch.object(
+        Granule,
+        "read",
+        autospec=True,
+        side_effect=Granule.read,
+    ) as read:
+        paths = stactools.viirs.cog.cogify(href, tmp_dir, assets=assets)
+        assert [os.path.basename(path).split("_", 1)[1] for path in paths] == [
+            "500_m_16_days_NDVI.tif",
+            "500_m_16_days_NDVI_fill.tif",
+            "500_m_16_days_VI_Quality.tif",
+        ]
+        assert [call.args[1].name for call in read.call_args_list] == assets
+
+        paths = stactools.viirs.cog.cogify(
+            href, tmp_dir, exclude_assets=["500_m_16_days_NDVI"]
+        )
+        assert not any("_NDVI" in path for path in paths)
+
+
+def test_check_assets() -> None:
+    cog = stactools.viirs.cog
+    assert "500_m_16_days_pixel_reliability" in cog.subdataset_assets("VNP13A1")
+    assert "500_m_16_days_pixel_reliability_fill" not in cog.subdataset_assets(
+        "VNP13A1"
+    )
+    cog.check_assets(["VNP09A1", "VNP13A1"], ["SurfReflect_M1", "500_m_16_days_EVI"])
+    with pytest.raises(ValueError, match="SurfReflect_M1"):
+        cog.check_assets(["VNP13A1"], ["500_m_16_days_EVI", "SurfReflect_M1"])
+    cog.check_assets(["VNP99X1"], [])
+    cog.check_assets(["VNP99X1", "VNP13A1"], ["500_m_16_days_EVI"])
+
+
 def test_int8toint16_nodata() -> None:
     filename = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
     href = test_data.get_external_data(filename)
     _ = test_data.get_external_data(f"{filename}.xml")
-    with TemporaryDirectory() as tmp_dir:
+    with TemporaryDirectory() as tmp_dir, mock.patch(
+        "stactools.viirs.cog.gdal_supports_int8", return_value=False
+    ):
         paths = stactools.viirs.cog.cogify(href, tmp_dir)
         native_int8_cog = next(
             (path for path in paths if "pixel_reliability.tif" in path)
@@ -68,3 +123,266 @@ def test_int8toint16_nodata() -> None:
         with rasterio.open(native_int8_cog, "r") as src:
             assert src.dtypes[0] == "int16"
             assert src.nodata == -32768
+
+
+@pytest.mark.skipif(
+    not gdal_supports_int8(), reason="GDAL does not support native int8"
+)
+def test_native_int8_nodata() -> None:
+    filename = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+    href = test_data.get_external_data(filename)
+    _ = test_data.get_external_data(f"{filename}.xml")
+    with TemporaryDirectory() as tmp_dir:
+        paths = stactools.viirs.cog.cogify(href, tmp_dir)
+        for path in paths:
+            if "pixel_reliability" in path:
+                with rasterio.open(path, "r") as src:
+                    assert src.dtypes[0] == "int8"
+                    assert src.nodata == -128
+
+
+def test_create_cogs_workers() -> None:
+    filename = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+    href = test_data.get_external_data(filename)
+    _ = test_data.get_external_data(f"{filename}.xml")
+    with TemporaryDirectory() as serial_dir, TemporaryDirectory() as parallel_dir:
+        serial_paths = stactools.viirs.cog.cogify(href, serial_dir)
+        parallel_paths = stactools.viirs.cog.cogify(href, parallel_dir, workers=4)
+        assert [os.path.basename(p) for p in serial_paths] == [
+            os.path.basename(p) for p in parallel_paths
+        ]
+        for serial_path, parallel_path in zip(serial_paths, parallel_paths):
+            with open(serial_path, "rb") as serial, open(
+                parallel_path, "rb"
+            ) as parallel:
+                assert serial.read() == parallel.read()
+
+
+def test_create_cogs_streaming() -> None:
+    filename = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+    href = test_data.get_external_data(filename)
+    _ = test_data.get_external_data(f"{filename}.xml")
+    with TemporaryDirectory() as full_dir, TemporaryDirectory() as stream_dir:
+        full_paths = stactools.viirs.cog.cogify(href, full_dir)
+        stream_paths = stactools.viirs.cog.cogify(href, stream_dir, block_rows=100)
+        assert [os.path.basename(p) for p in full_paths] == [
+            os.path.basename(p) for p in stream_paths
+        ]
+        for full_path, stream_path in zip(full_paths, stream_paths):
+            with open(full_path, "rb") as full, open(stream_path, "rb") as stream:
+                assert full.read() == stream.read()
+
+
+def test_clean_without_nodata() -> None:
+    data = np.array([[1, 2], [3, 4]], dtype=np.int16)
+    clean_data, clean_nodata = stactools.viirs.cog._clean(data, [-1, -4], -32768)
+    np.testing.assert_array_equal(clean_data, data)
+    np.testing.assert_array_equal(clean_nodata, np.full((2, 2), -32768))
+
+
+def test_fill_mask() -> None:
+    mask = np.zeros((3, 2), dtype=np.uint8)
+    stactools.viirs.cog._fill_mask(mask, 0, np.array([[1, -1]]), -1)
+    stactools.viirs.cog._fill_mask(mask, 1, np.array([[np.nan, 2.0]]), np.nan)
+    stactools.viirs.cog._fill_mask(mask, 2, np.array([[-1, -1]]), None)
+    np.testing.assert_array_equal(mask, [[1, 0], [0, 1], [1, 1]])
+
+
+def _clean_masked_arrays(
+    data: Any, nodatas: List[int], nodata_new: int
+) -> Tuple[Any, Any]:
+    for nodata in nodatas:
+        data = np.ma.masked_equal(data, nodata)
+    clean_data = np.ma.filled(data, nodata_new)
+    mask = np.ma.getmaskarray(data)
+    clean_nodata = np.ma.getdata(data).copy()
+    clean_nodata[~mask] = nodata_new
+    return (clean_data, clean_nodata)
+
+
+@pytest.mark.parametrize("product,subdataset", MULTIPLE_NODATA_SUBDATASETS)
+def test_clean_matches_masked_arrays(product: str, subdataset: str) -> None:
+    multiple = MULTIPLE_NODATA[product][subdataset]
+    nodatas = cast(List[int], multiple["multiple"])
+    fragments = STACFragments(product)
+    dtype = fragments.subdataset_dict(subdataset)["raster:bands"][0]["data_type"]
+    nodata_new = stactools.viirs.cog._new_nodata(multiple, dtype)
+    info = np.iinfo(dtype)
+    rng = np.random.default_rng(0)
+    data = rng.integers(info.min, info.max, (300, 300), dtype=dtype, endpoint=True)
+    for i, nodata in enumerate(nodatas):
+        data[i::20] = nodata
+
+    expected = _clean_masked_arrays(data.copy(), nodatas, nodata_new)
+    clean_data, clean_nodata = stactools.viirs.cog._clean(
+        data.copy(), nodatas, nodata_new
+    )
+    assert clean_data.dtype == expected[0].dtype
+    assert clean_nodata.dtype == expected[1].dtype
+    np.testing.assert_array_equal(clean_data, expected[0])
+    np.testing.assert_array_equal(clean_nodata, expected[1])
+
+
+def test_clean_big_endian() -> None:
+    data = np.array([[1, -15000], [-13000, 4]], dtype=">i2")
+    clean_data, clean_nodata = stactools.viirs.cog._clean(
+        data.copy(), [-15000, -13000], -32768
+    )
+    np.testing.assert_array_equal(clean_data, [[1, -32768], [-32768, 4]])
+    np.testing.assert_array_equal(clean_nodata, [[-32768, -15000], [-13000, -32768]])
+
+
+def test_creation_options() -> None:
+    default = stactools.viirs.cog.COG_PROFILES["deflate"]
+    assert default.creation_options("int16") == stactools.viirs.cog.COG_PROFILE
+
+    lerc = stactools.viirs.cog.COG_PROFILES["lerc"]
+    assert lerc.creation_options("uint8") == {
+        "compress": "zstd",
+        "blocksize": 512,
+        "driver": "COG",
+        "level": 9,
+        "predictor": "YES",
+    }
+    float_options = lerc.creation_options("float32")
+    assert float_options["compress"] == "lerc_zstd"
+    assert float_options["max_z_error"] == 0.0
+
+
+def test_encoding_profile() -> None:
+    cog = stactools.viirs.cog
+    assert cog.encoding_profile("VNP13A1") == cog.COG_PROFILES["deflate"]
+    assert cog.encoding_profile("VNP13A1", "zstd") == cog.COG_PROFILES["zstd"]
+    profiles: Dict[str, Any] = {"VNP13A1": "zstd", "*": cog.EncodingProfile(level=1)}
+    assert cog.encoding_profile("VNP13A1", profiles) == cog.COG_PROFILES["zstd"]
+    assert cog.encoding_profile("VNP14A1", profiles).level == 1
+    with pytest.raises(ValueError):
+        cog.encoding_profile("VNP13A1", "unknown")
+
+
+def test_parse_profiles() -> None:
+    cog = stactools.viirs.cog
+    assert cog.parse_profiles([]) == {}
+    profiles = cog.parse_profiles(["zstd", "vnp13a1=lerc"], "4")
+    assert profiles["*"].compress == "zstd"
+    assert profiles["VNP13A1"].float_compress == "lerc_zstd"
+    assert all(profile.num_threads == "4" for profile in profiles.values())
+    assert cog.parse_profiles([], "all_cpus")["*"].num_threads == "ALL_CPUS"
+    with pytest.raises(ValueError):
+        cog.parse_profiles([], "0")
+
+
+def test_cog_with_profile() -> None:
+    data = np.linspace(0, 1, 64 * 64, dtype=np.float32).reshape(64, 64)
+    profile = stactools.viirs.cog.EncodingProfile(
+        float_compress="lerc_zstd", max_z_error=0.001, num_threads="2"
+    )
+    with TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "data.tif")
+        stactools.viirs.cog._cog(
+            data,
+            "EPSG:4326",
+            [0.1, 0.0, 0.0, 0.0, -0.1, 0.0],
+            {},
+            path,
+            options=profile.creation_options(data.dtype),
+        )
+        with rasterio.open(path) as src:
+            assert src.compression.name == "lerc_zstd"
+            np.testing.assert_allclose(src.read(1), data, atol=0.001)
+
+
+@pytest.mark.parametrize("block_rows", [None, 3])
+def test_create_cogs_3d(block_rows: Any) -> None:
+    data = np.arange(3 * 8 * 6, dtype=np.int16).reshape(8, 6, 3)
+    metadata = mock.Mock(
+        product="VNP09A1",
+        crs="EPSG:4326",
+        grid_transform=lambda grid: [1, 0, 0, 0, -1, 0],
+    )
+    with TemporaryDirectory() as tmp_dir:
+        h5_path = os.path.join(tmp_dir, "VNP09A1.A2022145.h11v05.001.2022154194417.h5")
+        with h5py.File(h5_path, "w") as h5:
+            h5.create_dataset(
+                "HDFEOS/GRIDS/g/Data Fields/x", data=data, chunks=(4, 6, 3)
+            )
+
+        (multiband,) = stactools.viirs.cog.cogify(
+            h5_path, tmp_dir, block_rows=block_rows, metadata=metadata
+        )
+        assert multiband.endswith("_x.tif")
+        with rasterio.open(multiband) as src:
+            assert src.count == 3
+            np.testing.assert_array_equal(src.read(), np.moveaxis(data, 2, 0))
+
+        split = stactools.viirs.cog.cogify(
+            h5_path,
+            tmp_dir,
+            block_rows=block_rows,
+            metadata=metadata,
+            band_mode="split",
+        )
+        assert [os.path.basename(p)[-12:] for p in split] == [
+            f"_x_band{band}.tif" for band in (1, 2, 3)
+        ]
+        for band, path in enumerate(split):
+            with rasterio.open(path) as src:
+                assert src.count == 1
+                np.testing.assert_array_equal(src.read(1), data[:, :, band])
+
+
+def test_create_cogs_skip_existing() -> None:
+    metadata = mock.Mock(
+        product="VNP09A1",
+        crs="EPSG:4326",
+        grid_transform=lambda grid: [1, 0, 0, 0, -1, 0],
+    )
+    cog_write = stactools.viirs.cog._cog
+
+    def fail_y(data: Any, *args: Any) -> None:
+        if args[3].endswith("_y.tif"):
+            raise RuntimeError("y failed")
+        cog_write(data, *args)
+
+    def cogify_reads(**kwargs: Any) -> List[str]:
+        with mock.patch.object(
+            Granule, "read", autospec=True, side_effect=Granule.read
+        ) as read:
+            stactools.viirs.cog.cogify(
+                h5_path, tmp_dir, metadata=metadata, skip_existing=True, **kwargs
+            )
+        return [call.args[1].name for call in read.call_args_list]
+
+    with TemporaryDirectory() as tmp_dir:
+        h5_path = os.path.join(tmp_dir, "VNP09A1.A2022145.h11v05.001.2022154194417.h5")
+        with h5py.File(h5_path, "w") as h5:
+            for name, dtype in (("x", np.int16), ("y", np.int8)):
+                h5.create_dataset(
+                    f"HDFEOS/GRIDS/g/Data Fields/{name}",
+                    data=np.ones((8, 6), dtype=dtype),
+                )
+
+        with mock.patch.object(stactools.viirs.cog, "_cog", side_effect=fail_y):
+            with pytest.raises(RuntimeError):
+                stactools.viirs.cog.cogify(
+                    h5_path, tmp_dir, metadata=metadata, skip_existing=True
+                )
+        assert cogify_reads() == ["y"]
+        assert cogify_reads() == []
+        assert cogify_reads(profile="zstd") == ["x", "y"]
+        threaded = stactools.viirs.cog.parse_profiles(["zstd"], "ALL_CPUS")
+        assert cogify_reads(profile=threaded) == []
+        with mock.patch.object(
+            stactools.viirs.cog,
+            "gdal_supports_int8",
+            return_value=not gdal_supports_int8(),
+        ):
+            assert cogify_reads(profile=threaded) == ["y"]
+        assert cogify_reads(profile=threaded) == ["y"]
+
+        x_path = os.path.join(
+            tmp_dir, "VNP09A1.A2022145.h11v05.001.2022154194417_x.tif"
+        )
+        with open(x_path, "r+b") as file:
+            file.truncate(100)
+        assert cogify_reads(profile="zstd") == ["x"]
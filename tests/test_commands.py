@@ -4,6 +4,7 @@ from tempfile import TemporaryDirectory
 from typing import Callable, List
 
 import pystac
+import rasterio
 from click import Command, Group
 from stactools.testing.cli_test import CliTestCase
 
@@ -24,6 +25,60 @@ class CommandsTest(CliTestCase):
             tif_files = glob.glob(f"{tmp_dir}/*.tif")
             self.assertEqual(len(tif_files), 5)
 
+    def test_create_cogs_profile(self) -> None:
+        filename = "VNP09H1.A2012017.h00v09.001.2016294114238.h5"
+        infile = test_data.get_external_data(filename)
+        with TemporaryDirectory() as tmp_dir:
+            cmd = (
+                f"viirs create-cogs {infile} -o {tmp_dir} "
+                "-p zstd -p VNP14A1=deflate --cog-threads 2"
+            )
+            self.run_command(cmd)
+            tif_files = glob.glob(f"{tmp_dir}/*.tif")
+            self.assertEqual(len(tif_files), 5)
+            for tif_file in tif_files:
+                with rasterio.open(tif_file) as src:
+                    self.assertEqual(src.compression.name, "zstd")
+
+    def test_create_cogs_assets(self) -> None:
+        filename = "VNP09H1.A2012017.h00v09.001.2016294114238.h5"
+        infile = test_data.get_external_data(filename)
+        with TemporaryDirectory() as tmp_dir:
+            cmd = (
+                f"viirs create-cogs {infile} -o {tmp_dir} "
+                "--asset SurfReflect_I1 --asset SurfReflect_I2"
+            )
+            self.run_command(cmd)
+            tif_files = glob.glob(f"{tmp_dir}/*.tif")
+            self.assertEqual(len(tif_files), 2)
+
+    def test_create_cogs_skip_existing(self) -> None:
+        filename = "VNP09H1.A2012017.h00v09.001.2016294114238.h5"
+        infile = test_data.get_external_data(filename)
+        with TemporaryDirectory() as tmp_dir:
+            cmd = f"viirs create-cogs {infile} -o {tmp_dir} --skip-existing"
+            self.run_command(cmd)
+            manifest = os.path.join(
+                tmp_dir, f"{os.path.splitext(filename)[0]}.cogs.json"
+            )
+            self.assertTrue(os.path.exists(manifest))
+            modified = {
+                path: os.path.getmtime(path) for path in glob.glob(f"{tmp_dir}/*.tif")
+            }
+            self.assertEqual(len(modified), 5)
+            self.run_command(cmd)
+            for path, mtime in modified.items():
+                self.assertEqual(os.path.getmtime(path), mtime)
+
+    def test_benchmark_cogs(self) -> None:
+        filename = "VNP14A1.A2019054.h11v05.001.2019055201945.h5"
+        infile = test_data.get_external_data(filename)
+        result = self.run_command(f"viirs benchmark-cogs {infile} -p deflate -p zstd")
+        self.assertEqual(result.exit_code, 0)
+        lines = result.output.splitlines()
+        self.assertEqual(len(lines), 1 + 2 * 4 + 2)
+        self.assertTrue(lines[-1].startswith("total"))
+
     def test_create_item(self) -> None:
         filename = "VNP09H1.A2012017.h00v09.001.2016294114238.h5"
         infile = test_data.get_external_data(filename)
@@ -47,3 +102,77 @@ class CommandsTest(CliTestCase):
             collection_path = os.path.join(tmp_dir, f"{product}/collection.json")
             collection = pystac.read_file(collection_path)
             collection.validate()
+
+    def test_create_collection_unsupported_product(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            text_filename = f"{tmp_dir}/list.txt"
+            with open(text_filename, "w") as txt_file:
+                txt_file.write(
+                    f"{tmp_dir}/VNP99X1.A2012017.h00v09.001.2016294114238.h5"
+                )
+            for options in ["", " --asset SurfReflect_M1"]:
+                cmd = f"viirs create-collection {text_filename} {tmp_dir}{options}"
+                result = self.run_command(cmd)
+                self.assertEqual(result.exit_code, 1)
+                self.assertIn("not supported", result.output)
+                self.assertIn(
+                    "Failed to create Items for 1 of 1 H5 files", result.output
+                )
+
+    def test_create_collection_jobs(self) -> None:
+        filenames = [
+            "VNP09H1.A2012017.h00v09.001.2016294114238.h5",
+            "VNP14A1.A2019054.h11v05.001.2019055201945.h5",
+        ]
+        infiles = [test_data.get_external_data(filename) for filename in filenames]
+        with TemporaryDirectory() as tmp_dir:
+            text_filename = f"{tmp_dir}/list.txt"
+            with open(text_filename, "w") as txt_file:
+                txt_file.write("\n".join(infiles))
+            cmd = f"viirs create-collection {text_filename} {tmp_dir} --jobs 2"
+            self.run_command(cmd)
+            for filename in filenames:
+                product = filename.split(".")[0]
+                collection_path = os.path.join(tmp_dir, f"{product}/collection.json")
+                collection = pystac.read_file(collection_path)
+                collection.validate()
+
+    def test_create_collection_incremental(self) -> None:
+        filenames = [
+            "VNP09A1.A2012017.h00v09.001.2016294114238.h5",
+            "VNP09A1.A2022145.h11v05.001.2022154194417.h5",
+        ]
+        product = filenames[0].split(".")[0]
+        infiles = [test_data.get_external_data(filename) for filename in filenames]
+        with TemporaryDirectory() as tmp_dir:
+            text_filename = f"{tmp_dir}/list.txt"
+            with open(text_filename, "w") as txt_file:
+                txt_file.write(infiles[0])
+            cmd = f"viirs create-collection {text_filename} {tmp_dir} --incremental"
+            self.run_command(cmd)
+            collection_path = os.path.join(tmp_dir, f"{product}/collection.json")
+            item_path = glob.glob(f"{tmp_dir}/{product}/*/*.json")[0]
+            mtime = os.path.getmtime(item_path)
+
+            with open(text_filename, "w") as txt_file:
+                txt_file.write("\n".join(infiles))
+            self.run_command(cmd)
+            collection = pystac.Collection.from_file(collection_path)
+            collection.validate_all()
+            self.assertEqual(len(list(collection.get_items())), 2)
+            self.assertEqual(os.path.getmtime(item_path), mtime)
+
+    def test_create_collection_stream(self) -> None:
+        filename = "VNP09H1.A2012017.h00v09.001.2016294114238.h5"
+        product = filename.split(".")[0]
+        infile = test_data.get_external_data(filename)
+        with TemporaryDirectory() as tmp_dir:
+            text_filename = f"{tmp_dir}/list.txt"
+            with open(text_filename, "w") as txt_file:
+                txt_file.write(infile)
+            cmd = f"viirs create-collection {text_filename} {tmp_dir} --stream"
+            self.run_command(cmd)
+            collection_path = os.path.join(tmp_dir, f"{product}/collection.json")
+            collection = pystac.Collection.from_file(collection_path)
+            collection.validate_all()
+            self.assertEqual(len(list(collection.get_items())), 1)
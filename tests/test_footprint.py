@@ -0,0 +1,85 @@
+import os
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pytest
+import rasterio
+import rasterio.shutil
+import shapely.geometry
+
+from stactools.viirs import constants, footprint
+from stactools.viirs.cog import COG_PROFILE, DataMask
+
+TRANSFORM = [0.001, 0.0, -75.0, 0.0, -0.001, 36.0]
+
+
+def _data_mask() -> DataMask:
+    mask = np.zeros((2048, 2048), dtype=np.uint8)
+    mask[100:1500, 300:2000] = 1
+    return DataMask(mask, TRANSFORM)
+
+
+def test_decimation_factor() -> None:
+    sinusoidal = [463.3127165279165, 0.0, -8895604.157333, 0.0, -463.3127165279167, 0]
+    shape = (2400, 2400)
+    crs = constants.SINUSOIDAL_WKT2
+    assert footprint.decimation_factor(sinusoidal, crs, shape) == 1
+    assert footprint.decimation_factor(sinusoidal, crs, shape, 0.004) == 1
+    assert footprint.decimation_factor(sinusoidal, crs, shape, 0.02) == 4
+    assert footprint.decimation_factor(TRANSFORM, "EPSG:4326", (8, 8), 1.0) == 8
+
+
+def test_decimate() -> None:
+    mask = np.zeros((5, 5), dtype=np.uint8)
+    mask[0, 0] = 1
+    mask[4, 4] = 1
+    decimated = footprint._decimate(mask, 2)
+    np.testing.assert_array_equal(decimated, [[1, 0, 0], [0, 0, 0], [0, 0, 1]])
+
+
+def test_data_footprint_from_mask() -> None:
+    data_mask = _data_mask()
+    full = footprint.data_footprint(data_mask, "EPSG:4326")
+    decimated = footprint.data_footprint(data_mask, "EPSG:4326", max_pixel_size=0.01)
+    assert full is not None and decimated is not None
+    assert full.decimation == 1
+    assert decimated.decimation == 8
+    assert full.bbox == pytest.approx([-74.7, 34.5, -73.0, 35.9])
+    assert decimated.bbox == pytest.approx(full.bbox, abs=0.008)
+    assert shapely.geometry.shape(decimated.geometry).contains(
+        shapely.geometry.shape(full.geometry)
+    )
+
+
+def test_data_footprint_from_cog() -> None:
+    data_mask = _data_mask()
+    with TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "data.tif")
+        with rasterio.open(
+            path,
+            "w",
+            driver="GTiff",
+            dtype="uint8",
+            nodata=0,
+            count=1,
+            height=2048,
+            width=2048,
+            crs="EPSG:4326",
+            transform=rasterio.Affine(*TRANSFORM),
+        ) as dst:
+            dst.write(data_mask.mask, 1)
+        cog_path = os.path.join(tmp_dir, "data_cog.tif")
+        with rasterio.open(path) as src:
+            rasterio.shutil.copy(src, cog_path, **COG_PROFILE)
+
+        full = footprint.data_footprint(cog_path, "EPSG:4326")
+        decimated = footprint.data_footprint(cog_path, "EPSG:4326", max_pixel_size=0.01)
+    assert full is not None and decimated is not None
+    assert decimated.decimation == 8
+    assert full.bbox == pytest.approx([-74.7, 34.5, -73.0, 35.9])
+    assert decimated.bbox == pytest.approx(full.bbox, abs=0.008)
+
+
+def test_data_footprint_no_data() -> None:
+    data_mask = DataMask(np.zeros((16, 16), dtype=np.uint8), TRANSFORM)
+    assert footprint.data_footprint(data_mask, "EPSG:4326", max_pixel_size=1.0) is None
@@ -0,0 +1,107 @@
+from unittest import mock
+
+import pytest
+
+from stactools.viirs.fragment import STACFragments, _load_fragment
+from stactools.viirs.utils import UnsupportedProduct
+
+
+def test_fragments_loaded_once() -> None:
+    _load_fragment.cache_clear()
+    for _ in range(3):
+        STACFragments("VNP09A1", 2012017).subdataset_dict("SurfReflect_M1")
+    assert _load_fragment.cache_info().misses == 1
+
+
+def test_unsupported_product() -> None:
+    with pytest.raises(UnsupportedProduct):
+        STACFragments("VNP99X1").assets_dict()
+
+
+def test_modified_dicts_do_not_leak() -> None:
+    fragments = STACFragments("VNP09A1", 2022145)
+    asset = fragments.subdataset_dict("SurfReflect_M1")
+    asset["href"] = "foo.tif"
+    asset["raster:bands"][0]["nodata"] = 1
+    fragments.assets_dict()["SurfReflect_M1"]["title"] = "foo"
+    fragments.collection_dict()["title"] = "foo"
+
+    for fragments in [fragments, STACFragments("VNP09A1", 2022145)]:
+        asset = fragments.subdataset_dict("SurfReflect_M1")
+        assert "href" not in asset
+        assert asset["raster:bands"][0]["nodata"] == -28672
+        assert fragments.assets_dict()["SurfReflect_M1"]["title"] != "foo"
+        assert fragments.collection_dict()["title"] != "foo"
+
+
+def test_asset_updates_are_per_instance() -> None:
+    updated = STACFragments("VNP09A1", 2022145).subdataset_dict("SurfReflect_M1")
+    original = STACFragments("VNP09A1", 2012017).subdataset_dict("SurfReflect_M1")
+    assert updated["raster:bands"][0]["nodata"] == -28672
+    assert original["raster:bands"][0]["nodata"] == 0
+
+
+def test_asset_update_epochs() -> None:
+    def qc_nodata(production_year_doy: int) -> int:
+        fragments = STACFragments("VNP09A1", production_year_doy)
+        nodata: int = fragments.subdataset_dict("SurfReflect_QC")["raster:bands"][0][
+            "nodata"
+        ]
+        return nodata
+
+    def m1_nodata(production_year_doy: int) -> int:
+        fragments = STACFragments("VNP09A1", production_year_doy)
+        nodata: int = fragments.subdataset_dict("SurfReflect_M1")["raster:bands"][0][
+            "nodata"
+        ]
+        return nodata
+
+    assert m1_nodata(2017144) == 0
+    assert m1_nodata(2017145) == -28672
+    assert qc_nodata(2017232) != 4294967295
+    assert qc_nodata(2017233) == 4294967295
+    assert m1_nodata(2017233) == -28672
+    assert (
+        STACFragments("VNP09A1", 2018001).assets
+        is STACFragments("VNP09A1", 2022145).assets
+    )
+
+
+def test_int8_bands_match_cog_data_type() -> None:
+    fragments = STACFragments("VNP13A1")
+    with mock.patch("stactools.viirs.fragment.gdal_supports_int8", return_value=True):
+        native = fragments.subdataset_dict("500_m_16_days_pixel_reliability_fill")
+    with mock.patch("stactools.viirs.fragment.gdal_supports_int8", return_value=False):
+        upcast = fragments.assets_dict()["500_m_16_days_pixel_reliability_fill"]
+    assert native["raster:bands"][0]["data_type"] == "int8"
+    assert native["raster:bands"][0]["nodata"] == -128
+    assert upcast["raster:bands"][0]["data_type"] == "int16"
+    assert upcast["raster:bands"][0]["nodata"] == -32768
+
+
+def test_band_layer_asset() -> None:
+    fragments = STACFragments("VNP09A1", 2022145)
+    fragments.assets = {
+        "Parameters": {
+            "title": "Model Parameters",
+            "raster:bands": [{"data_type": "int16", "nodata": 32767}] * 3,
+            "eo:bands": [{"name": "iso"}, {"name": "vol"}, {"name": "geo"}],
+        }
+    }
+    assert len(fragments.subdataset_dict("Parameters")["raster:bands"]) == 3
+    layer = fragments.subdataset_dict("Parameters_band2")
+    assert layer["title"] == "Model Parameters, Band 2"
+    assert layer["raster:bands"] == [{"data_type": "int16", "nodata": 32767}]
+    assert layer["eo:bands"] == [{"name": "vol"}]
+    with pytest.raises(IndexError):
+        fragments.subdataset_dict("Parameters_band4")
+
+
+def test_int8_bands_of_existing_cogs() -> None:
+    fragments = STACFragments("VNP13A1")
+    assert fragments.has_int8_bands("500_m_16_days_pixel_reliability")
+    assert not fragments.has_int8_bands("500_m_16_days_NDVI")
+    with mock.patch("stactools.viirs.fragment.gdal_supports_int8", return_value=True):
+        asset = fragments.subdataset_dict("500_m_16_days_pixel_reliability", "int16")
+    assert asset["raster:bands"][0]["data_type"] == "int16"
+    assert asset["raster:bands"][0]["nodata"] == -32768
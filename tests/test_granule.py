@@ -0,0 +1,52 @@
+import os
+from tempfile import TemporaryDirectory
+
+import h5py
+import numpy as np
+import pytest
+import rasterio
+
+from stactools.viirs.granule import Granule
+from tests import test_data
+
+
+def test_tags_and_nodata_match_gdal() -> None:
+    filename = "VNP09A1.A2022145.h11v05.001.2022154194417.h5"
+    href = test_data.get_external_data(filename)
+    with Granule(href) as granule:
+        subdatasets = [s for s in granule.subdatasets if len(s.shape) == 2]
+        assert subdatasets
+        for subdataset in subdatasets:
+            with rasterio.open(
+                f"HDF5:{href}://{subdataset.key.replace(' ', '_')}"
+            ) as src:
+                assert granule.tags == src.tags()
+                if src.nodata is not None:
+                    assert src.nodata == subdataset.nodata
+
+
+@pytest.mark.parametrize("band_axis", [0, 2])
+def test_read_bands(band_axis: int) -> None:
+    data = np.arange(3 * 8 * 6, dtype=np.int16).reshape(8, 6, 3)
+    data = np.moveaxis(data, 2, band_axis)
+    chunks = (1, 4, 6) if band_axis == 0 else (4, 6, 3)
+    with TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "test.h5")
+        with h5py.File(path, "w") as h5:
+            h5.create_dataset("HDFEOS/GRIDS/g/Data Fields/x", data=data, chunks=chunks)
+
+        with Granule(path) as granule:
+            (subdataset,) = granule.subdatasets
+            assert subdataset.band_axis == band_axis
+            assert subdataset.band_count == 3
+            assert subdataset.band_shape == (8, 6)
+            for band in range(3):
+                expected = np.take(data, band, axis=band_axis)
+                np.testing.assert_array_equal(
+                    granule.read_band(subdataset, band), expected
+                )
+                blocks = list(granule.read_blocks(subdataset, 3, band))
+                assert [row for row, _ in blocks] == [0, 4]
+                np.testing.assert_array_equal(
+                    np.concatenate([block for _, block in blocks]), expected
+                )
@@ -0,0 +1,57 @@
+import pytest
+import shapely.geometry
+
+from stactools.viirs import grid
+from stactools.viirs.metadata import Metadata
+from tests import EXAMPLE_FILE_NAME, example_metadata
+
+
+def test_tile_counts() -> None:
+    assert len(grid.tile_index("VNP13A1")) == 460
+    assert len(grid.tile_index("VNP46A2")) == 648
+    assert grid.tile_index("VNP09A1") is grid.tile_index("VNP13A1")
+
+
+def test_sinusoidal_tile_matches_metadata() -> None:
+    metadata: Metadata = example_metadata(EXAMPLE_FILE_NAME)
+    tile = grid.tile_index(metadata.product).tile(metadata.tile_id)
+    assert (tile.horizontal_tile, tile.vertical_tile) == (11, 5)
+    assert tile.bbox == pytest.approx([-91.3785102, 30.0, -69.2820323, 40.0], abs=1e-6)
+    assert tile.transform(grid.TILE_SHAPES[metadata.product]) == pytest.approx(
+        metadata.transform, abs=1e-2
+    )
+    footprint = shapely.geometry.shape(tile.geometry)
+    outline = shapely.geometry.shape(metadata.geometry(10, 0.0006))
+    assert footprint.symmetric_difference(outline).area < 1e-3
+
+
+def test_geographic_tile() -> None:
+    tile = grid.tile_index("VNP46A2").tile("61011005")
+    assert tile.bbox == [-70.0, 30.0, -60.0, 40.0]
+    assert tile.geometry["coordinates"] == [
+        [[-70.0, 40.0], [-70.0, 30.0], [-60.0, 30.0], [-60.0, 40.0], [-70.0, 40.0]]
+    ]
+    assert tile.transform(2400) == pytest.approx(
+        [10 / 2400, 0.0, -70.0, 0.0, -10 / 2400, 40.0]
+    )
+
+
+def test_edge_tile_within_antimeridian() -> None:
+    tile = grid.tile_index("VNP09A1").tile("51000009")
+    assert tile.bbox[0] == -180.0
+    assert all(-180 <= lon <= 180 for lon, _ in tile.geometry["coordinates"][0])
+    assert shapely.geometry.shape(tile.geometry).is_valid
+
+
+def test_unknown_tile() -> None:
+    with pytest.raises(KeyError):
+        grid.tile_index("VNP13A1").tile("51000000")
+
+
+def test_intersecting() -> None:
+    index = grid.tile_index("VNP13A1")
+    tile_ids = [tile.tile_id for tile in index.intersecting([-75, 35, -74, 36])]
+    assert tile_ids == ["51011005", "51012005"]
+
+    tile_ids = [tile.tile_id for tile in index.intersecting([179, -1, -179, 1])]
+    assert tile_ids == ["51000008", "51035008", "51000009", "51035009"]
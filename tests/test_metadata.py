@@ -0,0 +1,99 @@
+from unittest import mock
+
+import pytest
+
+from stactools.viirs.metadata import (
+    Grid,
+    Metadata,
+    _tile_geometry,
+    parse_grid_structure,
+)
+from tests import (
+    EXAMPLE_FILE_NAME,
+    VNP_H5_ONLY_FILE_NAMES,
+    VNP_HAS_XML_FILE_NAMES,
+    example_metadata,
+    test_data,
+)
+
+STRUCT_METADATA = """GROUP=SwathStructure
+END_GROUP=SwathStructure
+GROUP=GridStructure
+\tGROUP=GRID_1
+\t\tGridName="VNP_Grid_1km_2D"
+\t\tXDim=1200
+\t\tYDim=1200
+\t\tUpperLeftPointMtrs=(-7783653.637667,4447802.078667)
+\t\tLowerRightMtrs=(-6671703.118000,3335851.559000)
+\t\tProjection=HE5_GCTP_SNSOID
+\t\tGROUP=Dimension
+\t\tEND_GROUP=Dimension
+\t\tGROUP=DataField
+\t\t\tOBJECT=DataField_1
+\t\t\t\tDataFieldName="sur_refl_M1"
+\t\t\t\tDimList=("YDim","XDim")
+\t\t\tEND_OBJECT=DataField_1
+\t\tEND_GROUP=DataField
+\tEND_GROUP=GRID_1
+\tGROUP=GRID_2
+\t\tGridName="VNP_Grid_500m_2D"
+\t\tXDim=2400
+\t\tYDim=2400
+\t\tUpperLeftPointMtrs=(-7783653.637667,4447802.078667)
+\t\tLowerRightMtrs=(-6671703.118000,3335851.559000)
+\tEND_GROUP=GRID_2
+END_GROUP=GridStructure
+GROUP=PointStructure
+\tXDim=1
+END_GROUP=PointStructure
+END
+"""
+
+
+def test_parse_grid_structure() -> None:
+    grids = parse_grid_structure(STRUCT_METADATA)
+    assert list(grids) == ["VNP_Grid_1km_2D", "VNP_Grid_500m_2D"]
+    assert grids["VNP_Grid_1km_2D"] == {
+        "XDim": "1200",
+        "YDim": "1200",
+        "UpperLeftPointMtrs": "(-7783653.637667,4447802.078667)",
+        "LowerRightMtrs": "(-6671703.118000,3335851.559000)",
+    }
+    assert grids["VNP_Grid_500m_2D"]["XDim"] == "2400"
+
+
+def test_parse_grid_structure_without_grids() -> None:
+    assert (
+        parse_grid_structure("GROUP=SwathStructure\nEND_GROUP=SwathStructure\n") == {}
+    )
+
+
+def test_grid_from_fields() -> None:
+    fields = parse_grid_structure(STRUCT_METADATA)["VNP_Grid_1km_2D"]
+    grid = Grid.from_fields("VNP_Grid_1km_2D", fields)
+    assert grid.shape == [1200, 1200]
+    assert grid.left == -7783653.637667
+    assert grid.top == 4447802.078667
+    assert grid.right == -6671703.118
+    assert grid.bottom == 3335851.559
+
+
+@pytest.mark.parametrize("file_name", VNP_HAS_XML_FILE_NAMES + VNP_H5_ONLY_FILE_NAMES)
+def test_from_h5_matches_gdal_tags(file_name: str) -> None:
+    href = test_data.get_external_data(file_name)
+    metadata = Metadata.from_h5(href)
+    with mock.patch("stactools.viirs.metadata.gdal_tags", return_value={}):
+        gdal_metadata = Metadata.from_h5(href)
+    assert metadata == gdal_metadata
+
+
+def test_geometry_memoized() -> None:
+    metadata = example_metadata(EXAMPLE_FILE_NAME)
+    _tile_geometry.cache_clear()
+    geometry = metadata.geometry(10, 0.0006)
+    geometry["coordinates"] = []
+    assert metadata.geometry(10, 0.0006)["coordinates"]
+    assert _tile_geometry.cache_info().hits == 1
+
+    metadata.geometry(5, 0.0006)
+    assert _tile_geometry.cache_info().misses == 2
@@ -1,5 +1,40 @@
+import subprocess
+import sys
+
 import stactools.viirs
 
+DEFERRED_MODULES = [
+    "h5py",
+    "pkg_resources",
+    "stactools.viirs.cog",
+    "stactools.viirs.granule",
+    "stactools.viirs.metadata",
+    "stactools.viirs.stac",
+]
+
 
 def test_version() -> None:
     assert stactools.viirs.__version__ is not None
+
+
+def test_plugin_import_time() -> None:
+    # Loading the plugin happens on every stactools CLI invocation, so it should
+    # not import the modules used to read H5 files and create STAC objects.
+    code = (
+        "import sys, time\n"
+        "import click, stactools.core\n"
+        "start = time.perf_counter()\n"
+        "from stactools.viirs.commands import create_viirs_command\n"
+        "from stactools.viirs.fragment import STACFragments\n"
+        "create_viirs_command(click.Group())\n"
+        "STACFragments('VNP09A1').assets_dict()\n"
+        "print(time.perf_counter() - start)\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    seconds, modules = result.stdout.splitlines()
+    print(f"stactools-viirs plugin import time: {float(seconds) * 1000:.1f} ms")
+    imported = set(modules.split())
+    assert not imported.intersection(DEFERRED_MODULES)
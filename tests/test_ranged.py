@@ -0,0 +1,54 @@
+import os
+from tempfile import TemporaryDirectory
+
+import h5py
+import numpy as np
+
+from stactools.viirs.metadata import viirs_metadata
+from stactools.viirs.ranged import HeaderOnly, RangedFile
+from tests import test_data
+
+
+def test_ranged_file_reads_blocks() -> None:
+    content = bytes(range(256)) * 64
+    with TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "test.bin")
+        with open(path, "wb") as file:
+            file.write(content)
+
+        with RangedFile(path, block_size=1024, max_blocks=2) as ranged:
+            assert ranged.size == len(content)
+            ranged.seek(1000)
+            assert ranged.read(100) == content[1000:1100]
+            assert ranged.bytes_read == 2048
+            assert ranged.requests == 2
+
+            ranged.seek(-10, os.SEEK_END)
+            assert ranged.read() == content[-10:]
+            assert ranged.read() == b""
+            assert ranged.bytes_read == 3072
+
+
+def test_ranged_file_h5() -> None:
+    with TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "test.h5")
+        with h5py.File(path, "w") as h5:
+            h5.attrs["StartTime"] = "2022-04-07 00:00:00.000"
+            h5.create_dataset("data", data=np.zeros(2**20, dtype="u1"))
+
+        with RangedFile(path, block_size=4096) as ranged:
+            with h5py.File(ranged, "r") as h5:
+                assert h5.attrs["StartTime"] == "2022-04-07 00:00:00.000"
+            assert ranged.bytes_read < 2**16
+
+
+def test_header_only_metadata() -> None:
+    file_name = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+    href = test_data.get_external_data(file_name)
+    metadata = viirs_metadata(href)
+    header_metadata = viirs_metadata(href, header_only=HeaderOnly())
+    assert metadata.bytes_read is None
+    assert header_metadata.bytes_read
+    assert header_metadata.bytes_read < os.path.getsize(href)
+    header_metadata.bytes_read = None
+    assert header_metadata == metadata
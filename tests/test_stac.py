@@ -1,11 +1,27 @@
+import json
 import os
+from datetime import datetime, timezone
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Optional
+from unittest import mock
 
+import numpy as np
 import pytest
+import rasterio
 import shapely.geometry
+from pystac import Asset, CatalogType, Collection, Item
 from stactools.core.utils.antimeridian import Strategy
 
-from stactools.viirs import stac
-from tests import VNP_H5_ONLY_FILE_NAMES, VNP_HAS_XML_FILE_NAMES, test_data
+from stactools.viirs import cog, stac
+from stactools.viirs.cog import DataMask
+from stactools.viirs.metadata import viirs_metadata
+from tests import (
+    EXAMPLE_FILE_NAME,
+    VNP_H5_ONLY_FILE_NAMES,
+    VNP_HAS_XML_FILE_NAMES,
+    example_metadata,
+    test_data,
+)
 
 
 def test_valid_data_footprint_option() -> None:
@@ -32,6 +48,33 @@ def test_valid_data_footprint_option() -> None:
     assert poly.area == pytest.approx(122.39202964999998)
 
 
+@pytest.mark.parametrize("block_rows", [None, 1000])
+def test_data_footprint_from_cogify_masks(block_rows: Optional[int]) -> None:
+    h5_filename = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+    h5_href = test_data.get_external_data(h5_filename)
+    _ = test_data.get_external_data(f"{h5_filename}.xml")
+    with TemporaryDirectory() as tmp_dir:
+        data_masks: Dict[str, DataMask] = {}
+        cog_hrefs = cog.cogify(
+            h5_href, tmp_dir, block_rows=block_rows, data_masks=data_masks
+        )
+        assert list(data_masks) == ["500_m_16_days_NDVI"]
+
+        item = stac.create_item(h5_href, cog_hrefs=cog_hrefs, use_data_footprint=True)
+        with mock.patch(
+            "stactools.viirs.stac.raster_footprint.update_geometry_from_asset_footprint"
+        ) as update_from_asset:
+            mask_item = stac.create_item(
+                h5_href,
+                cog_hrefs=cog_hrefs,
+                use_data_footprint=True,
+                data_masks=data_masks,
+            )
+        update_from_asset.assert_not_called()
+        assert mask_item.geometry == item.geometry
+        assert mask_item.bbox == item.bbox
+
+
 def test_read_href_modifier() -> None:
     filename = "VNP09H1.A2012017.h00v09.001.2016294114238.h5"
     href = test_data.get_external_data(filename)
@@ -141,3 +184,223 @@ def test_raster_outline_footprint_option() -> None:
     item_dict = item.to_dict()
     assert len(item_dict["geometry"]["coordinates"][0]) == 23
     item.validate()
+
+
+def test_create_items_batch() -> None:
+    hrefs = []
+    for file_name in VNP_HAS_XML_FILE_NAMES[:3]:
+        hrefs.append(test_data.get_external_data(file_name))
+        _ = test_data.get_external_data(f"{file_name}.xml")
+    missing = os.path.join(os.path.dirname(hrefs[0]), VNP_HAS_XML_FILE_NAMES[5])
+    missing = missing.replace(".h11v05.", ".h99v99.")
+    hrefs.append(missing)
+
+    progress = []
+    result = stac.create_items(
+        hrefs, jobs=2, progress=lambda done, total: progress.append((done, total))
+    )
+    assert progress[-1] == (4, 4)
+    assert list(result.failures) == [missing]
+    assert [item.id for item in result.items["VNP09A1"]] == [
+        os.path.splitext(file_name)[0] for file_name in VNP_HAS_XML_FILE_NAMES[:2]
+    ]
+    assert len(result.items["VNP09H1"]) == 1
+    for items in result.items.values():
+        for item in items:
+            item.validate()
+
+
+def test_create_items_unknown_asset() -> None:
+    with pytest.raises(ValueError, match="foo"):
+        stac.create_items(
+            VNP_HAS_XML_FILE_NAMES[:3],
+            create_cogs=True,
+            assets=["SurfReflect_M1"],
+            exclude_assets=["foo"],
+        )
+
+
+def test_create_item_with_metadata() -> None:
+    filename = "VNP13A1.A2022097.h11v05.001.2022113080900.h5"
+    href = test_data.get_external_data(filename)
+    _ = test_data.get_external_data(f"{filename}.xml")
+    expected = stac.create_item(href).to_dict()
+
+    metadata = viirs_metadata(href)
+    with mock.patch("stactools.viirs.stac.viirs_metadata") as mock_metadata:
+        item = stac.create_item(href, metadata=metadata)
+    mock_metadata.assert_not_called()
+    item_dict = item.to_dict()
+    for d in (expected, item_dict):
+        d["properties"].pop("created")
+    assert item_dict == expected
+
+
+def test_create_item_int16_cog_on_int8_gdal() -> None:
+    with TemporaryDirectory() as tmp_dir:
+        h5_href = os.path.join(tmp_dir, EXAMPLE_FILE_NAME)
+        cog_hrefs = []
+        for name, nodata in [("pixel_reliability", -32768), ("NDVI", -15000)]:
+            cog_href = os.path.join(
+                tmp_dir, f"{EXAMPLE_FILE_NAME[:-3]}_500_m_16_days_{name}.tif"
+            )
+            with rasterio.open(
+                cog_href,
+                "w",
+                driver="GTiff",
+                dtype="int16",
+                nodata=nodata,
+                count=1,
+                height=4,
+                width=4,
+            ) as dst:
+                dst.write(np.zeros((1, 4, 4), dtype=np.int16))
+            cog_hrefs.append(cog_href)
+
+        with mock.patch(
+            "stactools.viirs.fragment.gdal_supports_int8", return_value=True
+        ):
+            item = stac.create_item(
+                h5_href, cog_hrefs=cog_hrefs, metadata=example_metadata(h5_href)
+            )
+    reliability = item.assets["500_m_16_days_pixel_reliability"].to_dict()
+    assert reliability["raster:bands"][0]["data_type"] == "int16"
+    assert reliability["raster:bands"][0]["nodata"] == -32768
+    ndvi = item.assets["500_m_16_days_NDVI"].to_dict()
+    assert ndvi["raster:bands"][0]["data_type"] == "int16"
+
+
+def _tile_item(id: str, bbox: List[float], start: datetime) -> Item:
+    return Item(
+        id=id,
+        geometry=shapely.geometry.mapping(shapely.geometry.box(*bbox)),
+        bbox=bbox,
+        datetime=start,
+        properties={},
+    )
+
+
+def test_add_items_incrementally() -> None:
+    h5_hrefs = [
+        "VNP13A1.A2022097.h11v05.001.2022113080900.h5",
+        "VNP13A1.A2022113.h11v05.001.2022129080900.h5",
+    ]
+    first_bbox = [-90.0, 30.0, -80.0, 40.0]
+    first_datetime = datetime(2022, 4, 7, tzinfo=timezone.utc)
+    first = _tile_item(
+        "VNP13A1.A2022097.h11v05.001.2022113080900", first_bbox, first_datetime
+    )
+    with TemporaryDirectory() as tmp_dir:
+        collection_path = os.path.join(tmp_dir, "VNP13A1", "collection.json")
+        collection = stac.create_collection("VNP13A1")
+        collection.set_self_href(collection_path)
+        collection.catalog_type = CatalogType.SELF_CONTAINED
+        stac.add_items(collection, [first])
+        first.save_object(include_self_link=False)
+        collection.save_object(include_self_link=False)
+        assert collection.extent.spatial.bboxes == [first_bbox]
+
+        collection = Collection.from_file(collection_path)
+        item_hrefs = stac.linked_item_hrefs(collection)
+        assert item_hrefs == {first.id: first.get_self_href()}
+        assert stac.outdated_h5_hrefs(h5_hrefs, item_hrefs) == h5_hrefs[1:]
+
+        second = _tile_item(
+            "VNP13A1.A2022113.h11v05.001.2022129080900",
+            [-100.0, 35.0, -85.0, 45.0],
+            datetime(2022, 4, 23, tzinfo=timezone.utc),
+        )
+        replacement = _tile_item(first.id, first_bbox, first_datetime)
+        stac.add_items(collection, [second, replacement])
+        assert sorted(stac.linked_item_hrefs(collection)) == [first.id, second.id]
+        assert collection.extent.spatial.bboxes == [[-100.0, 30.0, -80.0, 45.0]]
+        assert collection.extent.temporal.intervals == [
+            [first_datetime, second.datetime]
+        ]
+
+
+def test_collection_writer() -> None:
+    first = _tile_item(
+        "VNP13A1.A2022097.h11v05.001.2022113080900",
+        [-90.0, 30.0, -80.0, 40.0],
+        datetime(2022, 4, 7, tzinfo=timezone.utc),
+    )
+    second = _tile_item(
+        "VNP13A1.A2022113.h11v05.001.2022129080900",
+        [-100.0, 35.0, -85.0, 45.0],
+        datetime(2022, 4, 23, tzinfo=timezone.utc),
+    )
+    with TemporaryDirectory() as tmp_dir:
+        writer = stac.CollectionWriter(tmp_dir, validate=False)
+        writer.add(first)
+        item_path = os.path.join(tmp_dir, "VNP13A1", first.id, f"{first.id}.json")
+        assert os.path.exists(item_path)
+        assert not os.path.exists(os.path.join(tmp_dir, "VNP13A1", "collection.json"))
+        writer.add(second)
+        assert [
+            link.target for link in writer.collections["VNP13A1"].get_links("item")
+        ] == [
+            item_path,
+            os.path.join(tmp_dir, "VNP13A1", second.id, f"{second.id}.json"),
+        ]
+        writer.close()
+
+        collection = Collection.from_file(
+            os.path.join(tmp_dir, "VNP13A1", "collection.json")
+        )
+        assert [item.id for item in collection.get_items()] == [first.id, second.id]
+        assert collection.extent.spatial.bboxes == [[-100.0, 30.0, -80.0, 45.0]]
+        assert collection.extent.temporal.intervals == [
+            [first.datetime, second.datetime]
+        ]
+
+
+def _tile_items() -> List[Item]:
+    items = []
+    for tile_id, day in [("51012005", 7), ("51011005", 7), ("51011005", 23)]:
+        item = _tile_item(
+            f"VNP13A1.A2022{90 + day:03d}.h{tile_id[3:5]}v{tile_id[6:]}.001.2022113080900",
+            [-90.0, 30.0, -80.0, 40.0],
+            datetime(2022, 4, day, tzinfo=timezone.utc),
+        )
+        item.properties["viirs:tile-id"] = tile_id
+        item.add_asset("hdf5", Asset(f"/data/{item.id}.h5"))
+        items.append(item)
+    return items
+
+
+def test_write_ndjson() -> None:
+    with TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "items.ndjson")
+        assert stac.write_ndjson(iter(_tile_items()), path) == 3
+        with open(path) as file:
+            lines = file.readlines()
+    assert [json.loads(line)["id"] for line in lines] == [i.id for i in _tile_items()]
+
+
+def test_write_geoparquet() -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    pytest.importorskip("stac_geoparquet")
+    with TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "items.parquet")
+        assert stac.write_geoparquet(_tile_items(), path) == 3
+        parquet_file = pq.ParquetFile(path)
+        assert parquet_file.metadata.num_row_groups == 2
+        assert parquet_file.read().column("id").to_pylist() == [
+            "VNP13A1.A2022097.h11v05.001.2022113080900",
+            "VNP13A1.A2022113.h11v05.001.2022113080900",
+            "VNP13A1.A2022097.h12v05.001.2022113080900",
+        ]
+
+
+def test_collection_writer_ndjson() -> None:
+    with TemporaryDirectory() as tmp_dir:
+        writer = stac.CollectionWriter(tmp_dir, validate=False, item_format="ndjson")
+        for item in _tile_items():
+            writer.add(item)
+        collection = writer.close()["VNP13A1"]
+        assert not collection.get_links("item")
+        with open(os.path.join(tmp_dir, "VNP13A1", "items.ndjson")) as file:
+            items = [json.loads(line) for line in file]
+        assert {item["collection"] for item in items} == {collection.id}
+        assert os.path.exists(os.path.join(tmp_dir, "VNP13A1", "collection.json"))